@@ -0,0 +1,131 @@
+# batch_run.py — headless batch mode for the orchestrator
+#
+# Usage:
+#   python batch_run.py topics.txt --out cards.jsonl --workers 4
+#   python batch_run.py topics.txt --processes --workers 4
+#
+# topics.txt holds one query per line; blank lines and '#' comments are skipped.
+import argparse
+import json
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+from rate_limit import configure_rate_limits
+from tracing import start_trace
+
+STAGES = ("fetch", "clean", "ner", "filter", "llm")
+
+
+def read_topics(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [
+            line.strip() for line in f
+            if line.strip() and not line.lstrip().startswith("#")
+        ]
+
+
+def _init_worker(share):
+    # Each worker process gets its own limiters; split the quota between them.
+    configure_rate_limits(share=share)
+
+
+def run_topic(query):
+    """Run the full pipeline for one topic and return its summary card."""
+    import pipeline
+
+    card = pipeline.lookup_story_card(query)
+    if card is not None:
+        return card
+
+    articles = pipeline.fetch_articles(query)
+    if not articles:
+        return {"query": query, "error": "No articles found."}
+
+    articles = pipeline.prepare_articles(query, articles)
+    return pipeline.build_summary_card(query, articles, story_id=pipeline.index_articles(query, articles))
+
+
+def _safe_run_topic(query, trace_file=None, profile=False):
+    """
+    Returns (card, stats) where stats maps top-level stage → {"seconds", "items"}.
+    """
+    with start_trace(query, profile=profile, trace_file=trace_file) as trace:
+        try:
+            card = run_topic(query)
+        except Exception as e:
+            card = {"query": query, "error": f"{type(e).__name__}: {e}"}
+
+    stats = {
+        s["name"]: {"seconds": s["wall_ms"] / 1000, "items": s.get("items", 0)}
+        for s in trace.spans if s["name"] in STAGES
+    }
+    if trace.profile:
+        card["profile"] = trace.profile
+    return card, stats
+
+
+def print_report(totals, n_topics, n_failed, wall, stream=sys.stderr):
+    print(f"\n=== Batch report: {n_topics} topics ({n_failed} failed) in {wall:.1f}s "
+          f"→ {n_topics / wall if wall else 0:.2f} topics/s ===", file=stream)
+    print(f"{'stage':<8}{'calls':>7}{'items':>8}{'total s':>10}{'avg s':>9}{'items/s':>10}", file=stream)
+    for stage in STAGES:
+        t = totals.get(stage)
+        if not t or not t["calls"]:
+            continue
+        rate = t["items"] / t["seconds"] if t["seconds"] else 0.0
+        print(f"{stage:<8}{t['calls']:>7}{t['items']:>8}{t['seconds']:>10.2f}"
+              f"{t['seconds'] / t['calls']:>9.2f}{rate:>10.1f}", file=stream)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Run the AI News Orchestrator over a file of topics.")
+    ap.add_argument("topics", help="text file with one topic per line")
+    ap.add_argument("--out", default="cards.jsonl", help="output JSONL file (default: cards.jsonl)")
+    ap.add_argument("--workers", type=int, default=4, help="pool size (default: 4)")
+    ap.add_argument("--processes", action="store_true",
+                    help="use a process pool instead of threads; rate limits are split across processes")
+    ap.add_argument("--trace-file", default=None, help="append tracing spans to this JSONL file")
+    ap.add_argument("--profile", action="store_true", help="attach a cProfile report to each card")
+    args = ap.parse_args(argv)
+
+    topics = read_topics(args.topics)
+    if not topics:
+        print("No topics to run.", file=sys.stderr)
+        return 1
+
+    workers = max(1, min(args.workers, len(topics)))
+    if args.processes:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(1.0 / workers,))
+    else:
+        pool = ThreadPoolExecutor(max_workers=workers)
+
+    totals = defaultdict(lambda: {"calls": 0, "items": 0, "seconds": 0.0})
+    failed = 0
+    t0 = time.perf_counter()
+
+    with pool, open(args.out, "w", encoding="utf-8") as out:
+        futures = {pool.submit(_safe_run_topic, q, args.trace_file, args.profile): q for q in topics}
+        for fut in as_completed(futures):
+            card, stats = fut.result()
+            if "error" in card:
+                failed += 1
+                print(f"[fail] {futures[fut]}: {card['error']}", file=sys.stderr)
+            else:
+                print(f"[ok]   {futures[fut]}", file=sys.stderr)
+            card["stage_seconds"] = {k: round(v["seconds"], 4) for k, v in stats.items()}
+            out.write(json.dumps(card, ensure_ascii=False) + "\n")
+            out.flush()
+
+            for stage, s in stats.items():
+                totals[stage]["calls"] += 1
+                totals[stage]["items"] += s["items"]
+                totals[stage]["seconds"] += s["seconds"]
+
+    print_report(totals, len(topics), failed, time.perf_counter() - t0)
+    return 0 if failed < len(topics) else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
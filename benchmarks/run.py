@@ -0,0 +1,252 @@
+# benchmarks/run.py — offline throughput/latency benchmarks for every stage
+#
+#   python -m benchmarks.run                          # everything, sizes 10/100/1000
+#   python -m benchmarks.run --only clean,timeline --sizes 10,100
+#   python -m benchmarks.run --save bench.json
+#   python -m benchmarks.run --compare bench.json --max-regression 0.25
+#
+# No network: fetchers hit a local fixture server and Gemini is replaced by
+# recorded replies (see stand_in.py). NER still runs the real model.
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("GEMINI_API_KEY", "offline-benchmark")
+
+from benchmarks.stand_in import CannedGeminiModel, make_articles, read_fixture, serve_fixtures
+from rate_limit import configure_rate_limits
+
+QUERY = "Chandrayaan-3"
+
+
+def _cleaned(articles):
+    from preprocess import clean_html
+    for a in articles:
+        a["content"] = clean_html(a["content"])
+    return articles
+
+
+# ---------------------------------------------------
+# Benchmark definitions
+#   each returns a zero-arg callable; the callable is what gets timed
+# ---------------------------------------------------
+def bench_clean_html(n):
+    from preprocess import clean_html
+    raw = [a["content"] for a in make_articles(n)]
+    return lambda: [clean_html(t) for t in raw]
+
+
+def bench_smart_filter(n):
+    from preprocess import smart_filter_articles
+    articles = _cleaned(make_articles(n))
+    return lambda: smart_filter_articles(QUERY, articles)
+
+
+def bench_milestones(n):
+    from timeline import build_candidate_milestones
+    articles = _cleaned(make_articles(n))
+    return lambda: build_candidate_milestones(articles)
+
+
+def bench_assemble(n):
+    from timeline import build_candidate_milestones, assemble_timeline
+    candidates = build_candidate_milestones(_cleaned(make_articles(n)))
+    return lambda: assemble_timeline(candidates)
+
+
+def bench_local_card(n):
+    from pipeline import build_local_card
+    articles = _cleaned(make_articles(n))
+    return lambda: build_local_card(QUERY, articles)
+
+
+def bench_ner_annotate(n):
+    from nlp import annotate_event_text
+    texts = [a["content"] for a in _cleaned(make_articles(n))]
+    return lambda: [annotate_event_text(t) for t in texts]
+
+
+def bench_ner_entities(n):
+    from nlp import extract_entities
+    texts = [a["content"] for a in _cleaned(make_articles(n))]
+    return lambda: [extract_entities(t) for t in texts]
+
+
+def bench_ner_dates(n):
+    from nlp import extract_dates_from_text
+    texts = [a["content"] for a in _cleaned(make_articles(n))]
+    return lambda: [extract_dates_from_text(t) for t in texts]
+
+
+def bench_parse_timeline(n):
+    from llm_service import clean_timeline_json
+    raw = read_fixture("gemini_timeline.txt")
+    return lambda: [clean_timeline_json(raw) for _ in range(n)]
+
+
+def bench_parse_discrepancies(n):
+    from discrepancies import clean_json
+    raw = read_fixture("gemini_event_discrepancy.txt")
+    return lambda: [clean_json(raw) for _ in range(n)]
+
+
+def bench_llm_stages(n):
+    """All three batch_* calls against the canned model — i.e. prompt build + parse."""
+    import llm_service
+    articles = _cleaned(make_articles(n))
+
+    def run():
+        result = llm_service.batch_timeline_and_summary(articles, query=QUERY)
+        llm_service.batch_evaluate_link_authenticity(articles)
+        llm_service.batch_check_discrepancies([t.to_dict() for t in result.timeline], articles)
+    return run
+
+
+def bench_fetch(n, cache_dir=None):
+    """Every fetcher once against the local fixture server (n is ignored)."""
+    from fetch_gdelt import fetch_from_gdelt
+    from fetch_google_news import fetch_google_news
+    from fetch_news import fetch_from_newsapi
+    from fetch_wikipedia import fetch_wikipedia_page
+    from http_client import set_http_cache
+
+    def run():
+        set_http_cache(cache_dir)
+        fetch_google_news(QUERY, max_results=15)
+        fetch_from_gdelt(QUERY, max_results=12)
+        fetch_from_newsapi(QUERY, page_size=10)
+        fetch_wikipedia_page(QUERY)
+    return run
+
+
+def bench_fetch_revalidated(n):
+    """bench_fetch with the conditional-GET cache warm: every source answers 304."""
+    return bench_fetch(n, cache_dir=tempfile.mkdtemp(prefix="bench-http-"))
+
+
+def bench_end_to_end(n):
+    """clean → NER → filter → all LLM stages on n articles (fetch excluded)."""
+    import pipeline
+    articles = make_articles(n)
+
+    def run():
+        batch = pipeline.prepare_articles(QUERY, [dict(a) for a in articles])
+        pipeline.build_summary_card(QUERY, batch)
+    return run
+
+
+# name → (factory, group, sized?)
+BENCHMARKS = {
+    "clean_html": (bench_clean_html, "clean", True),
+    "smart_filter_articles": (bench_smart_filter, "filter", True),
+    "build_candidate_milestones": (bench_milestones, "timeline", True),
+    "assemble_timeline": (bench_assemble, "timeline", True),
+    "build_local_card": (bench_local_card, "timeline", True),
+    "annotate_event_text": (bench_ner_annotate, "ner", True),
+    "extract_entities": (bench_ner_entities, "ner", True),
+    "extract_dates_from_text": (bench_ner_dates, "ner", True),
+    "clean_timeline_json": (bench_parse_timeline, "parse", True),
+    "discrepancies.clean_json": (bench_parse_discrepancies, "parse", True),
+    "llm_stages": (bench_llm_stages, "llm", True),
+    "fetch_all_sources": (bench_fetch, "fetch", False),
+    "fetch_all_sources_304": (bench_fetch_revalidated, "fetch", False),
+    "end_to_end": (bench_end_to_end, "e2e", True),
+}
+
+
+# ---------------------------------------------------
+# Runner
+# ---------------------------------------------------
+def measure(fn, repeats, warmup=1):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    samples.sort()
+    return {
+        "median_ms": statistics.median(samples) * 1000,
+        "p95_ms": samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))] * 1000,
+        "min_ms": samples[0] * 1000,
+    }
+
+
+def run_benchmarks(groups=None, sizes=(10, 100, 1000), repeats=5):
+    import http_client
+    import llm_service
+
+    http_cache_dir = http_client.HTTP_CACHE_DIR
+
+    llm_service.set_model_factory(CannedGeminiModel)
+    configure_rate_limits(share=0)   # no pacing: measure our code, not the quota
+
+    results = []
+    with serve_fixtures():
+        for name, (factory, group, sized) in BENCHMARKS.items():
+            if groups and group not in groups:
+                continue
+            for n in (sizes if sized else (1,)):
+                fn = factory(n)
+                stats = measure(fn, repeats if n < 1000 else max(1, repeats // 2))
+                stats["items_per_s"] = n / (stats["median_ms"] / 1000) if stats["median_ms"] else 0.0
+                results.append({"benchmark": name, "group": group, "n": n, **stats})
+                print(f"{name:<28}{n:>6}{stats['median_ms']:>12.2f}{stats['p95_ms']:>12.2f}"
+                      f"{stats['items_per_s']:>14.1f}", flush=True)
+    llm_service.set_model_factory(None)
+    http_client.set_http_cache(http_cache_dir)
+    return results
+
+
+def compare(results, baseline_path, max_regression):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {(r["benchmark"], r["n"]): r for r in json.load(f)}
+
+    regressions = []
+    for r in results:
+        old = baseline.get((r["benchmark"], r["n"]))
+        if not old or not old["median_ms"]:
+            continue
+        change = r["median_ms"] / old["median_ms"] - 1
+        if change > max_regression:
+            regressions.append((r["benchmark"], r["n"], old["median_ms"], r["median_ms"], change))
+
+    for name, n, old, new, change in regressions:
+        print(f"REGRESSION {name} n={n}: {old:.2f} ms → {new:.2f} ms (+{change:.0%})", file=sys.stderr)
+    return regressions
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Offline benchmarks for the AI News Orchestrator pipeline.")
+    ap.add_argument("--only", default="", help="comma-separated groups: " +
+                    ",".join(sorted({g for _, g, _ in BENCHMARKS.values()})))
+    ap.add_argument("--sizes", default="10,100,1000", help="article counts for sized benchmarks")
+    ap.add_argument("--repeats", type=int, default=5)
+    ap.add_argument("--save", default=None, help="write results as JSON")
+    ap.add_argument("--compare", default=None, help="baseline JSON from a previous --save")
+    ap.add_argument("--max-regression", type=float, default=0.25,
+                    help="allowed median slowdown vs baseline before failing (default: 0.25)")
+    args = ap.parse_args(argv)
+
+    groups = {g.strip() for g in args.only.split(",") if g.strip()}
+    sizes = tuple(int(s) for s in args.sizes.split(",") if s.strip())
+
+    print(f"{'benchmark':<28}{'n':>6}{'median ms':>12}{'p95 ms':>12}{'items/s':>14}")
+    results = run_benchmarks(groups, sizes, args.repeats)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare and compare(results, args.compare, args.max_regression):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
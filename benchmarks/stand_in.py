@@ -0,0 +1,158 @@
+# benchmarks/stand_in.py — local stand-ins for every external service
+#
+# serve_fixtures() starts a throwaway HTTP server on 127.0.0.1 that replays the
+# recorded responses in benchmarks/fixtures/ and points the fetch_* modules at
+# it. CannedGeminiModel replays recorded Gemini replies without the network.
+import hashlib
+import html
+import os
+import re
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# path prefix → (fixture file, content type)
+ROUTES = {
+    "/rss/search": ("google_news_rss.xml", "application/rss+xml; charset=utf-8"),
+    "/gdelt/api/v2/doc/doc": ("gdelt_artlist.json", "application/json"),
+    "/newsapi/v2/everything": ("newsapi_everything.json", "application/json"),
+    "/wiki/w/api.php": ("wikipedia_search.json", "application/json"),
+    "/wiki/wiki/": ("wikipedia_page.html", "text/html; charset=utf-8"),
+}
+
+
+def read_fixture(name, mode="r"):
+    with open(os.path.join(FIXTURE_DIR, name), mode, **({} if "b" in mode else {"encoding": "utf-8"})) as f:
+        return f.read()
+
+
+FIXTURE_LAST_MODIFIED = "Wed, 23 Aug 2023 12:45:00 GMT"
+SERVER_STATS = Counter()
+
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    """Serves fixtures with ETag/Last-Modified and answers revalidation with 304."""
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        for prefix, (name, ctype) in ROUTES.items():
+            if path.startswith(prefix):
+                body = read_fixture(name, "rb")
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+                if (self.headers.get("If-None-Match") == etag
+                        or self.headers.get("If-Modified-Since") == FIXTURE_LAST_MODIFIED):
+                    SERVER_STATS["304"] += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                SERVER_STATS["200"] += 1
+                SERVER_STATS["bytes"] += len(body)
+                self.send_response(200)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", FIXTURE_LAST_MODIFIED)
+                self.end_headers()
+                self.wfile.write(body)
+                return
+        self.send_error(404)
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+@contextmanager
+def serve_fixtures():
+    """
+    Run the fixture server and redirect all fetchers to it. Yields the base
+    URL; SERVER_STATS counts the 200s, 304s and body bytes it served.
+    """
+    import fetch_gdelt
+    import fetch_google_news
+    import fetch_news
+    import fetch_wikipedia
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FixtureHandler)
+    SERVER_STATS.clear()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    patches = [
+        (fetch_google_news, "GOOGLE_NEWS_RSS_URL", base + "/rss/search"),
+        (fetch_gdelt, "GDELT_DOC_URL", base + "/gdelt/api/v2/doc/doc"),
+        (fetch_news, "NEWSAPI_URL", base + "/newsapi/v2/everything"),
+        (fetch_wikipedia, "WIKIPEDIA_API_URL", base + "/wiki/w/api.php"),
+        (fetch_wikipedia, "WIKIPEDIA_PAGE_URL", base + "/wiki/wiki/"),
+    ]
+    saved = [(mod, attr, getattr(mod, attr)) for mod, attr, _ in patches]
+    for mod, attr, value in patches:
+        setattr(mod, attr, value)
+    try:
+        yield base
+    finally:
+        for mod, attr, value in saved:
+            setattr(mod, attr, value)
+        server.shutdown()
+        server.server_close()
+
+
+# ---------------------------------------------------
+# Gemini stand-in
+# ---------------------------------------------------
+class CannedGeminiModel:
+    """Drop-in for genai.GenerativeModel that answers from recorded replies."""
+
+    def __init__(self, model_name=None, **kwargs):
+        self.model_name = model_name
+
+    def generate_content(self, prompt, **kwargs):
+        if "credibility_score" in prompt:
+            text = read_fixture("gemini_credibility.txt")
+        elif "EVENT:" in prompt:
+            text = read_fixture("gemini_event_discrepancy.txt")
+        elif "is_consistent" in prompt:
+            text = read_fixture("gemini_discrepancies.txt")
+        else:
+            text = read_fixture("gemini_timeline.txt")
+        usage = SimpleNamespace(prompt_token_count=len(prompt) // 4, candidates_token_count=len(text) // 4)
+        return SimpleNamespace(text=text, usage_metadata=usage)
+
+
+# ---------------------------------------------------
+# Synthetic article batches
+# ---------------------------------------------------
+_ITEM_RE = re.compile(r"<item>(.*?)</item>", re.S)
+_TAG_RE = {tag: re.compile(rf"<{tag}[^>]*>(.*?)</{tag}>", re.S)
+           for tag in ("title", "link", "pubDate", "description", "source")}
+
+
+def fixture_articles():
+    """Articles as fetch_google_news would return them, parsed from the RSS fixture."""
+    articles = []
+    for item in _ITEM_RE.findall(read_fixture("google_news_rss.xml")):
+        field = {tag: html.unescape(rx.search(item).group(1)) for tag, rx in _TAG_RE.items()}
+        articles.append({
+            "title": field["title"],
+            "content": field["description"],
+            "publishedAt": field["pubDate"],
+            "url": field["link"],
+            "source": field["source"],
+        })
+    return articles
+
+
+def make_articles(n):
+    """n raw (uncleaned) articles, cycling the fixtures with unique URLs."""
+    base = fixture_articles()
+    out = []
+    for i in range(n):
+        a = dict(base[i % len(base)])
+        a["url"] = f"{a['url']}?v={i}"
+        out.append(a)
+    return out
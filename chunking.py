@@ -0,0 +1,103 @@
+# chunking.py — bounded sliding windows over very long documents
+#
+# fetch_wikipedia_page returns a whole page (tens to hundreds of KB) as one
+# "content" string. BERT-NER only sees 512 word-pieces at a time, so long
+# texts are cut into overlapping word windows, each window is annotated on
+# its own, and the entities are merged back across window boundaries.
+# Windows and sentences are produced lazily from precompiled regexes, so
+# only one window's worth of offsets is held at a time.
+import os
+import re
+from collections import deque
+from itertools import islice
+
+WINDOW_WORDS = int(os.getenv("NER_WINDOW_WORDS", "300"))      # ~400 word-pieces, under BERT's 512
+OVERLAP_WORDS = int(os.getenv("NER_OVERLAP_WORDS", "50"))
+
+# a "word" is capped at 64 chars so a long unbroken blob cannot blow up a window
+_WORD = re.compile(r"\S{1,64}")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def iter_windows(text, window=WINDOW_WORDS, overlap=OVERLAP_WORDS):
+    """
+    Yield (start, end) character offsets of overlapping windows of at most
+    `window` words, consecutive windows sharing `overlap` words.
+    """
+    if not 0 <= overlap < window:
+        raise ValueError("overlap must be smaller than window")
+    spans = deque()
+    fresh = 0   # words not yet covered by an emitted window
+    for m in _WORD.finditer(text):
+        spans.append(m.span())
+        fresh += 1
+        if len(spans) == window:
+            yield spans[0][0], spans[-1][1]
+            fresh = 0
+            for _ in range(window - overlap):
+                spans.popleft()
+    if fresh:
+        yield spans[0][0], spans[-1][1]
+
+
+def iter_sentences(text, max_words=200):
+    """
+    Lazily split text into stripped sentences; a "sentence" longer than
+    max_words (e.g. a page with no punctuation) is cut into word windows.
+    """
+    pos = 0
+    for m in _SENTENCE_END.finditer(text):
+        yield from _bounded(text[pos:m.start()], max_words)
+        pos = m.end()
+    yield from _bounded(text[pos:], max_words)
+
+
+def _bounded(sentence, max_words):
+    sentence = sentence.strip()
+    if not sentence:
+        return
+    if len(sentence) <= max_words * 4:   # cannot exceed max_words words; skip the scan
+        yield sentence
+        return
+    for start, end in iter_windows(sentence, max_words, 0):
+        yield sentence[start:end]
+
+
+def batched(iterable, n):
+    """Consecutive lists of up to n items."""
+    it = iter(iterable)
+    while True:
+        group = list(islice(it, n))
+        if not group:
+            return
+        yield group
+
+
+def merge_window_entities(windows):
+    """
+    Merge per-window entities of one document back into a single list.
+
+    windows: [(start, end, entities)] in document order, entity offsets
+    ("start"/"end", when the model reports them) relative to the window.
+    Each window owns the text up to the middle of its overlap with the next
+    one, so an entity seen by two windows is kept exactly once. Without
+    offsets, an entity repeated from the previous window is dropped instead.
+    """
+    merged = []
+    prev_keys = set()
+    for k, (start, end, entities) in enumerate(windows):
+        lo = (start + windows[k - 1][1]) // 2 if k else 0
+        hi = (windows[k + 1][0] + end) // 2 if k + 1 < len(windows) else float("inf")
+        keys = set()
+        for e in entities:
+            if "start" in e:
+                if not lo <= start + e["start"] < hi:
+                    continue
+            else:
+                key = (e["text"], e["label"])
+                keys.add(key)
+                if key in prev_keys:
+                    continue
+            merged.append({"text": e["text"], "label": e["label"]})
+        prev_keys = keys
+    return merged
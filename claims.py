@@ -0,0 +1,220 @@
+# claims.py — local numeric/date claim extraction and cross-source alignment
+#
+# Most cross-source "discrepancies" are differing figures: tolls, counts,
+# distances, costs, dates, times. This module pulls (entity, quantity, unit,
+# date) claims from each event's evidence passages with precompiled rules plus
+# the NER entities from nlp.py, and compares them across sources. Events whose
+# sources all state agreeing quantities get an instant verdict; everything else
+# (conflicts, single sources, prose-only outcomes) goes to the LLM.
+import re
+from collections import defaultdict, namedtuple
+
+Claim = namedtuple("Claim", "entity quantity unit date source approx text")
+
+_MONTHS = {
+    m: i + 1 for i, m in enumerate(
+        ["january", "february", "march", "april", "may", "june", "july",
+         "august", "september", "october", "november", "december"])
+}
+_MONTHS.update({m[:3]: i for m, i in list(_MONTHS.items())})
+
+_MONTH_RX = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+
+_DATE_PATTERNS = [
+    # 23 August 2023 / 23 Aug
+    re.compile(rf"\b(?P<d>\d{{1,2}})(?:st|nd|rd|th)?\s+(?P<m>{_MONTH_RX})(?:,?\s+(?P<y>(?:19|20)\d{{2}}))?\b", re.I),
+    # August 23, 2023 / Aug 23
+    re.compile(rf"\b(?P<m>{_MONTH_RX})\s+(?P<d>\d{{1,2}})(?:st|nd|rd|th)?(?:,?\s+(?P<y>(?:19|20)\d{{2}}))?\b", re.I),
+    # 2023-08-23
+    re.compile(r"\b(?P<y>(?:19|20)\d{2})-(?P<m>\d{2})-(?P<d>\d{2})\b"),
+]
+
+_TIME = re.compile(r"\b(?P<h>\d{1,2})[:.](?P<min>\d{2})\s*(?P<ampm>[ap]\.?m\.?)?", re.I)
+
+_APPROX = re.compile(r"\b(?:about|around|approximately|nearly|almost|over|more than|less than|roughly|some|up to|at least)\s*$", re.I)
+
+# unit word → canonical unit
+_UNITS = {
+    "metre": "m", "metres": "m", "meter": "m", "meters": "m", "m": "m",
+    "km": "km", "kilometre": "km", "kilometres": "km", "kilometer": "km", "kilometers": "km",
+    "cm": "cm", "centimetres": "cm", "centimeters": "cm",
+    "kg": "kg", "kilogram": "kg", "kilograms": "kg", "tonnes": "t", "tons": "t",
+    "%": "%", "percent": "%", "per cent": "%",
+    "people": "people", "persons": "people", "passengers": "people",
+    "dead": "deaths", "deaths": "deaths", "killed": "deaths", "died": "deaths",
+    "injured": "injured", "wounded": "injured",
+    "missing": "missing", "arrested": "arrests", "arrests": "arrests",
+    "votes": "votes", "seats": "seats", "runs": "runs", "wickets": "wickets", "goals": "goals",
+    "days": "days", "hours": "hours", "minutes": "minutes",
+}
+_SCALES = {"thousand": 1e3, "lakh": 1e5, "lakhs": 1e5, "million": 1e6, "crore": 1e7, "crores": 1e7, "billion": 1e9}
+_CURRENCY = {"rs": "INR", "rs.": "INR", "inr": "INR", "₹": "INR", "$": "USD", "usd": "USD", "€": "EUR", "£": "GBP"}
+
+_QUANTITY = re.compile(
+    r"(?P<cur>rs\.?|inr|usd|₹|\$|€|£)?\s*"
+    r"(?P<num>\d{1,3}(?:,\d{2,3})+|\d+(?:\.\d+)?)"
+    r"(?:\s*(?P<scale>thousand|lakhs?|million|crores?|billion))?"
+    r"(?:\s*(?P<unit>%|per cent|[a-z]+))?",
+    re.I
+)
+
+EXACT_TOLERANCE = 0.005
+APPROX_TOLERANCE = 0.10
+
+
+def _normalize_date(m):
+    month = m.group("m")
+    month = int(month) if month.isdigit() else _MONTHS.get(month.lower()[:3])
+    day = int(m.group("d"))
+    if not month or not 1 <= day <= 31:
+        return None
+    year = m.group("y")
+    return f"{year}-{month:02d}-{day:02d}" if year else f"--{month:02d}-{day:02d}"
+
+
+def _entity_for(text, entity_names):
+    low = text.lower()
+    for name in entity_names:
+        if name.lower() in low:
+            return name
+    return ""
+
+
+def extract_claims(text, source="", entity_names=()):
+    """
+    All (entity, quantity, unit, date) claims in one passage.
+    Dates and clock times are claims with unit "date" / "time".
+    """
+    claims = []
+    entity = _entity_for(text, entity_names)
+    spans = []
+
+    for rx in _DATE_PATTERNS:
+        for m in rx.finditer(text):
+            d = _normalize_date(m)
+            if d:
+                claims.append(Claim(entity, None, "date", d, source, False, m.group(0)))
+                spans.append(m.span())
+
+    for m in _TIME.finditer(text):
+        h, mi = int(m.group("h")), int(m.group("min"))
+        ampm = (m.group("ampm") or "").lower().replace(".", "")
+        if ampm == "pm" and h < 12:
+            h += 12
+        elif ampm == "am" and h == 12:
+            h = 0
+        if h < 24 and mi < 60:
+            claims.append(Claim(entity, h * 60 + mi, "time", None, source, False, m.group(0)))
+            spans.append(m.span())
+
+    for m in _QUANTITY.finditer(text):
+        if any(s <= m.start("num") < e for s, e in spans):
+            continue
+        cur = (m.group("cur") or "").lower()
+        unit_word = (m.group("unit") or "").lower()
+        scale = _SCALES.get((m.group("scale") or "").lower(), 1)
+        if cur:
+            unit = _CURRENCY.get(cur)
+        else:
+            unit = _UNITS.get(unit_word)
+        if not unit:
+            continue
+        value = float(m.group("num").replace(",", "")) * scale
+        approx = bool(_APPROX.search(text[:m.start()]))
+        claims.append(Claim(entity, value, unit, None, source, approx, m.group(0).strip()))
+
+    return claims
+
+
+def _values_conflict(a, b):
+    if a.unit == "date":
+        # compare only the parts both claims state (year may be missing)
+        return a.date[-5:] != b.date[-5:] or (
+            not a.date.startswith("--") and not b.date.startswith("--") and a.date != b.date)
+    tol = APPROX_TOLERANCE if (a.approx or b.approx) else EXACT_TOLERANCE
+    big = max(abs(a.quantity), abs(b.quantity)) or 1.0
+    return abs(a.quantity - b.quantity) / big > tol
+
+
+def align_claims(claims):
+    """
+    Compare claims across sources, grouped by unit.
+    Returns (agreements, conflicts) as lists of human-readable strings.
+    """
+    by_unit = defaultdict(list)
+    for c in claims:
+        by_unit[c.unit].append(c)
+
+    agreements, conflicts = [], []
+    for unit, group in by_unit.items():
+        if len({c.source for c in group}) < 2:
+            continue
+        # a conflict: two sources state incompatible values, and neither source
+        # also states a value compatible with the other's (passages often carry
+        # several figures in the same unit)
+        clashes = [
+            (a, b) for i, a in enumerate(group) for b in group[i + 1:]
+            if a.source != b.source and _values_conflict(a, b)
+            and not any(c.source == b.source and not _values_conflict(a, c) for c in group)
+            and not any(c.source == a.source and not _values_conflict(c, b) for c in group)
+        ]
+        subject = next((c.entity for c in group if c.entity), "")
+        about = f" for {subject}" if subject else ""
+        if clashes:
+            a, b = clashes[0]
+            conflicts.append(f"{a.source} reports \"{a.text}\" while {b.source} reports \"{b.text}\"{about}")
+        else:
+            sources = sorted({c.source for c in group})
+            agreements.append(f"{', '.join(sources)} agree on \"{group[0].text}\"{about}")
+    return agreements, conflicts
+
+
+def prefilter_event(event, entities_by_url=None, min_relative_score=0.6):
+    """
+    Local verdict for one event with its "evidence" passages (see
+    llm_service.build_event_evidence). Returns a dict with is_consistent,
+    agreement_points, discrepancies and severity only when at least two
+    sources state comparable quantities, every source takes part in such a
+    comparison, and all figures and dates agree. Otherwise returns None and the
+    event needs the LLM — figures alone cannot show that "crashed" and
+    "touched down safely" disagree.
+
+    Only passages scoring within min_relative_score of the best one are
+    compared; weaker hits usually describe a neighbouring event.
+    """
+    entities_by_url = entities_by_url or {}
+    evidence = event.get("evidence", [])
+    if evidence and "score" in evidence[0]:
+        floor = evidence[0]["score"] * min_relative_score
+        evidence = [p for p in evidence if p.get("score", 0) >= floor]
+    sources = {p.get("source", "") for p in evidence}
+    if len(sources) < 2:
+        return None
+
+    claims = []
+    for p in evidence:
+        names = [e["text"] for e in entities_by_url.get(p.get("url", ""), [])
+                 if e.get("label") in ("ORG", "PER", "LOC", "MISC")]
+        claims.extend(extract_claims(p["text"], p.get("source", ""), names))
+
+    agreements, conflicts = align_claims(claims)
+    if conflicts or not agreements:
+        return None
+
+    # Dates and times alone prove nothing: nearly every news passage carries
+    # one, whatever it says happened. Every source must share an agreeing
+    # quantity (toll, count, distance, cost…) with another source.
+    sources_by_unit = defaultdict(set)
+    for c in claims:
+        if c.unit not in ("date", "time"):
+            sources_by_unit[c.unit].add(c.source)
+    compared = set().union(*(s for s in sources_by_unit.values() if len(s) > 1))
+    if compared != sources:
+        return None
+
+    return {
+        "is_consistent": True,
+        "agreement_points": agreements,
+        "discrepancies": [],
+        "severity": "low",
+    }
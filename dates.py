@@ -0,0 +1,121 @@
+# dates.py — one date-normalization layer for fetchers, preprocess and timeline
+#
+# Sources disagree on formats: Google News RSS sends RFC-822
+# ("Wed, 23 Aug 2023 12:45:00 GMT"), GDELT sends 14-digit stamps
+# ("20230823124500" / "20230823T124500Z"), NewsAPI sends ISO-8601. Each gets a
+# fixed-format fast path; anything else goes to a memoized dateparser call.
+# Everything comes out as a UTC timestamp string "YYYY-MM-DDTHH:MM:SSZ".
+import re
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+
+_GDELT = re.compile(r"^(\d{4})(\d{2})(\d{2})T?(\d{2})(\d{2})(\d{2})Z?$")
+_ISO_START = re.compile(r"^\d{4}-\d{2}-\d{2}")
+_RFC822_START = re.compile(r"^(?:[A-Za-z]{3},\s*)?\d{1,2}\s+[A-Za-z]{3}\s+\d{4}")
+
+UTC_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def detect_format(value):
+    """Return "gdelt", "iso", "rfc822" or "text" for a raw date string."""
+    value = (value or "").strip()
+    if _GDELT.match(value):
+        return "gdelt"
+    if _ISO_START.match(value):
+        return "iso"
+    if _RFC822_START.match(value):
+        return "rfc822"
+    return "text"
+
+
+def _utc(dt):
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def _parse_gdelt(value):
+    m = _GDELT.match(value)
+    return datetime(*map(int, m.groups()), tzinfo=timezone.utc) if m else None
+
+
+def _parse_iso(value):
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"   # fromisoformat only accepts "Z" on 3.11+
+    return _utc(datetime.fromisoformat(value))
+
+
+def _parse_rfc822(value):
+    return _utc(parsedate_to_datetime(value))
+
+
+_PARSERS = {"gdelt": _parse_gdelt, "iso": _parse_iso, "rfc822": _parse_rfc822}
+
+
+@lru_cache(maxsize=8192)
+def parse_natural_date(text):
+    """Memoized dateparser fallback for free text ("last Tuesday", "23rd of August")."""
+    from dateparser import parse as _dateparser_parse
+    dt = _dateparser_parse(text)
+    return _utc(dt) if dt else None
+
+
+def parse_datetime(value, fmt=None):
+    """
+    Parse a raw date string to an aware UTC datetime, or None.
+    fmt skips detection when the caller knows the source format.
+    """
+    value = (value or "").strip()
+    if not value:
+        return None
+    if fmt not in _PARSERS:
+        # no fast parser for "text" — a free-text neighbour says nothing about this value
+        fmt = detect_format(value)
+    parser = _PARSERS.get(fmt)
+    if parser:
+        try:
+            dt = parser(value)
+            if dt:
+                return dt
+        except (TypeError, ValueError, IndexError):
+            pass
+        # declared format was wrong for this value — detect properly once
+        real = detect_format(value)
+        if real != fmt and real in _PARSERS:
+            try:
+                return _PARSERS[real](value)
+            except (TypeError, ValueError, IndexError):
+                pass
+    return parse_natural_date(value)
+
+
+def normalize_date(value, fmt=None):
+    """Raw date string → "YYYY-MM-DDTHH:MM:SSZ" (UTC), or "" if unparseable."""
+    dt = parse_datetime(value, fmt)
+    return dt.strftime(UTC_FORMAT) if dt else ""
+
+
+def normalize_day(value):
+    """Raw or normalized date string → "YYYY-MM-DD", or "" if unparseable."""
+    dt = parse_datetime(value)
+    return dt.date().isoformat() if dt else ""
+
+
+def normalize_article_dates(articles, field="publishedAt"):
+    """
+    Normalize a whole batch in place. The format is detected once from the
+    first value and reused for the rest (a batch comes from one source);
+    mismatches fall back to per-value detection. Unparseable values are kept.
+    """
+    fmt = None
+    for a in articles:
+        raw = a.get(field) or ""
+        if not raw:
+            continue
+        if fmt is None:
+            fmt = detect_format(raw)
+        normalized = normalize_date(raw, fmt)
+        if normalized:
+            a[field] = normalized
+    return articles
@@ -1,59 +1,72 @@
 # discrepancies.py
-import os
 import json
-import re
-from dotenv import load_dotenv
-import google.generativeai as genai
 
-load_dotenv()
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+from claims import prefilter_event
+from evidence_index import EvidenceIndex
+from llm_json import extract_json
+from llm_service import generate
+from llm_types import DiscrepancyResult
 
 def clean_json(raw):
     """
     Clean Gemini output and return parsed JSON.
     """
-    cleaned = raw.strip().replace("```json", "").replace("```", "").strip()
-    match = re.search(r'\{.*\}', cleaned, re.DOTALL)
-    if not match:
-        return {}
-    try:
-        return json.loads(match.group(0))
-    except:
-        return {}
+    parsed = extract_json(raw, expect=dict)
+    return parsed if parsed is not None else {}
 
 
-def check_event_discrepancies(event_item, articles):
+def check_event_discrepancies(event_item, articles, index=None, k=6):
     """
     Use Gemini to determine if multiple articles contain inconsistent facts
-    about the same event.
+    about the same event. Only the k passages most relevant to the event are
+    sent (pass a prebuilt EvidenceIndex when checking many events).
+    Returns a DiscrepancyResult.
     """
+    event_text = event_item.get("event", "") if isinstance(event_item, dict) else str(event_item)
+    index = index or EvidenceIndex(articles)
+
+    passages = index.search(event_text, k=k)
+    verdict = prefilter_event({"evidence": passages})
+    if verdict is not None:
+        return DiscrepancyResult(
+            date=event_item.get("date", "") if isinstance(event_item, dict) else "",
+            event=event_text,
+            **verdict
+        )
+
+    evidence = [
+        {"source": p["source"], "publishedAt": p["publishedAt"], "text": p["text"]}
+        for p in passages
+    ]
 
     prompt = (
         "You are an expert analyst comparing information across news articles.\n"
         "Determine whether different sources agree or conflict on this event.\n\n"
         "EVENT:\n"
-        f"{event_item}\n\n"
-        "ARTICLES:\n"
-        f"{articles}\n\n"
+        f"{json.dumps(event_item, ensure_ascii=False)}\n\n"
+        "EVIDENCE:\n"
+        f"{json.dumps(evidence, indent=2, ensure_ascii=False)}\n\n"
         "TASK:\n"
         "Identify factual consistency or contradictions. Compare:\n"
         "- Numbers (e.g., death tolls, prices, counts)\n"
         "- Dates reported\n"
         "- Claims about outcomes\n"
         "- Differing descriptions of the same event\n\n"
-        "Return ONLY VALID JSON in this format:\n"
+        "Return JSON in this format:\n"
         "{\n"
         "  \"is_consistent\": true | false,\n"
         "  \"discrepancies\": [\"list of mismatches\"],\n"
         "  \"agreement_points\": [\"list of common facts\"],\n"
         "  \"severity\": \"low\" | \"medium\" | \"high\"\n"
         "}\n"
-        "Return JSON only."
     )
 
-    model = genai.GenerativeModel("models/gemini-2.5-flash")
-
-    response = model.generate_content(prompt)
-    return response.text or "{}"
+    # routed to a tier-2 model (gemini-2.5-flash by default), see model_router.py
+    raw = generate("event_discrepancy", prompt, schema=DiscrepancyResult.SCHEMA)
+    result = DiscrepancyResult.from_dict(clean_json(raw or "{}"))
+    if isinstance(event_item, dict):
+        result.date = result.date or event_item.get("date", "")
+        result.event = result.event or event_item.get("event", "")
+    return result
 
 
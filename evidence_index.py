@@ -0,0 +1,100 @@
+# evidence_index.py — BM25 index over article sentences
+#
+# Used by the discrepancy checker so each timeline event is compared only
+# against the few passages that actually mention it, instead of every
+# article snippet. Prompt size per check stays flat as articles grow.
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a an and are as at be been by for from has have he her his in is it its of on or
+that the their this to was were which will with after before about into over than
+said says also more most not but they them she who what when where would could
+""".split())
+
+
+def tokenize(text):
+    return [t for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS and len(t) > 1]
+
+
+class EvidenceIndex:
+    """
+    Okapi BM25 over sentence-level passages, with an inverted index so a
+    query only touches passages sharing at least one term with it.
+    """
+
+    def __init__(self, articles, max_passage_chars=400, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.passages = []
+        self._lengths = []
+        self._postings = defaultdict(list)   # term → [(passage id, tf)]
+
+        seen = set()
+        for a in articles:
+            content = a.get("content", "") or ""
+            for sent in _SENTENCE_SPLIT.split(content):
+                sent = sent.strip()[:max_passage_chars]
+                key = (sent, a.get("source", ""))
+                if len(sent) < 20 or key in seen:
+                    continue
+                seen.add(key)
+                terms = tokenize(sent)
+                if not terms:
+                    continue
+                pid = len(self.passages)
+                self.passages.append({
+                    "text": sent,
+                    "source": a.get("source", ""),
+                    "url": a.get("url", ""),
+                    "publishedAt": a.get("publishedAt", ""),
+                })
+                self._lengths.append(len(terms))
+                for term, tf in Counter(terms).items():
+                    self._postings[term].append((pid, tf))
+
+        n = len(self.passages)
+        self._avgdl = (sum(self._lengths) / n) if n else 0.0
+        self._idf = {
+            term: math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5))
+            for term, p in self._postings.items()
+        }
+
+    def __len__(self):
+        return len(self.passages)
+
+    def search(self, query, k=6, max_per_source=2):
+        """
+        Top-k passages for a query as dicts with a "score" key. At most
+        max_per_source passages per source, so several outlets are compared.
+        """
+        if not self.passages:
+            return []
+
+        k1, b, avgdl = self.k1, self.b, self._avgdl or 1.0
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for pid, tf in self._postings[term]:
+                dl = self._lengths[pid]
+                scores[pid] += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl))
+
+        ranked = heapq.nlargest(max(k * 4, k), scores.items(), key=lambda kv: kv[1])
+        out = []
+        per_source = Counter()
+        for pid, score in ranked:
+            p = self.passages[pid]
+            if per_source[p["source"]] >= max_per_source:
+                continue
+            per_source[p["source"]] += 1
+            out.append({**p, "score": round(score, 4)})
+            if len(out) == k:
+                break
+        return out
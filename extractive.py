@@ -0,0 +1,125 @@
+# extractive.py — local extractive summary and milestone timeline (no LLM)
+#
+# The fallback half of the hedged summary card (pipeline.build_summary_card):
+# TextRank over TF-IDF sentence vectors picks the most central sentences,
+# and timeline.py's trigger-word milestones stand in for the LLM timeline.
+# Runs in tens of milliseconds, so a card can always be shown on time.
+import math
+from collections import Counter, defaultdict
+
+from chunking import iter_sentences
+from evidence_index import tokenize
+from timeline import assemble_timeline, build_candidate_milestones
+
+MAX_SENTENCES = 200          # graph size cap — TextRank cost grows with its square
+SENTENCES_PER_ARTICLE = 20
+
+
+def _candidate_sentences(articles):
+    sentences, seen = [], set()
+    for a in articles:
+        for i, s in enumerate(iter_sentences(a.get("content", "") or "")):
+            if i >= SENTENCES_PER_ARTICLE or len(sentences) >= MAX_SENTENCES:
+                break
+            if len(s) < 40 or s in seen:
+                continue
+            seen.add(s)
+            sentences.append(s)
+    return sentences
+
+
+def _tfidf(sentences):
+    """L2-normalized sparse TF-IDF vectors ({term: weight}) for each sentence."""
+    docs = [Counter(tokenize(s)) for s in sentences]
+    df = Counter(t for d in docs for t in d)
+    n = len(docs)
+    vectors = []
+    for d in docs:
+        v = {t: tf * math.log(1 + n / df[t]) for t, tf in d.items()}
+        norm = math.sqrt(sum(x * x for x in v.values())) or 1.0
+        vectors.append({t: x / norm for t, x in v.items()})
+    return vectors
+
+
+def _cosine(a, b):
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(x * b.get(t, 0.0) for t, x in a.items())
+
+
+def textrank(vectors, damping=0.85, iterations=50, tol=1e-6):
+    """
+    PageRank over the cosine-similarity graph of sentence vectors. Edges are
+    built from an inverted index, so only sentences sharing a term are paired.
+    """
+    n = len(vectors)
+    if not n:
+        return []
+
+    postings = defaultdict(list)
+    for i, v in enumerate(vectors):
+        for t, x in v.items():
+            postings[t].append((i, x))
+    edges = [defaultdict(float) for _ in range(n)]
+    for plist in postings.values():
+        for i, x in plist:
+            for j, y in plist:
+                if i != j:
+                    edges[i][j] += x * y
+    out_weight = [sum(e.values()) for e in edges]
+
+    scores = [1.0 / n] * n
+    for _ in range(iterations):
+        dangling = sum(scores[i] for i in range(n) if not out_weight[i])
+        new = [(1 - damping) / n + damping * dangling / n] * n
+        for i, e in enumerate(edges):
+            if out_weight[i]:
+                share = damping * scores[i] / out_weight[i]
+                for j, w in e.items():
+                    new[j] += share * w
+        delta = sum(abs(a - b) for a, b in zip(new, scores))
+        scores = new
+        if delta < tol:
+            break
+    return scores
+
+
+def summarize(articles, max_sentences=5, redundancy=0.7):
+    """
+    Extractive summary: the top-ranked sentences, skipping any too similar to
+    one already chosen, joined in their original order.
+    """
+    sentences = _candidate_sentences(articles)
+    if not sentences:
+        return ""
+    vectors = _tfidf(sentences)
+    scores = textrank(vectors)
+
+    chosen = []
+    for i in sorted(range(len(sentences)), key=lambda i: -scores[i]):
+        if all(_cosine(vectors[i], vectors[j]) < redundancy for j in chosen):
+            chosen.append(i)
+            if len(chosen) == max_sentences:
+                break
+    return " ".join(sentences[i] for i in sorted(chosen))
+
+
+def local_timeline(articles, limit=12, max_chars=220):
+    """
+    [{"date", "event"}] from trigger-word milestones (one per date, oldest
+    first); falls back to dated article titles when no sentence qualifies.
+    """
+    events = []
+    for group in assemble_timeline(build_candidate_milestones(articles)):
+        first = group["events"][0]["sentence"]
+        events.append({
+            "date": group["date"] if group["date"] != "unknown" else "Unknown",
+            "event": first if len(first) <= max_chars else first[:max_chars].rsplit(" ", 1)[0] + "…",
+        })
+    if not events:
+        events = [
+            {"date": (a.get("publishedAt") or "")[:10] or "Unknown", "event": a.get("title", "")}
+            for a in articles if a.get("title")
+        ]
+        events.sort(key=lambda e: e["date"])
+    return events[:limit]
@@ -3,6 +3,11 @@ import requests
 from datetime import datetime
 import logging
 
+from dates import normalize_date
+from http_client import conditional_get
+from rate_limit import get_limiter
+from tracing import span
+
 # optional: configure logging to file or stdout
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 
@@ -21,6 +26,13 @@ def fetch_from_gdelt(keyword, max_results=12, timeout=20):
     Returns list of article dicts: title, publishedAt, content, url, source
     If anything goes wrong returns [] (empty list).
     """
+    with span("fetch.gdelt", query=keyword) as s:
+        results = _fetch_from_gdelt(keyword, max_results, timeout, s)
+        s["items"] = len(results)
+    return results
+
+
+def _fetch_from_gdelt(keyword, max_results, timeout, s):
 
     params = {
         "query": keyword,
@@ -30,26 +42,35 @@ def fetch_from_gdelt(keyword, max_results=12, timeout=20):
         "sort": "date"
     }
 
+    get_limiter("gdelt").acquire()
     try:
-        resp = requests.get(GDELT_DOC_URL, params=params, timeout=timeout)
+        resp, articles = conditional_get(GDELT_DOC_URL, _parse_gdelt_response, params=params, timeout=timeout)
     except requests.RequestException as e:
         logging.error("Network error when calling GDELT: %s", e)
         return []
 
     logging.info("GDELT status: %s URL: %s", resp.status_code, resp.url)
+    s["status"] = resp.status_code
+    s["cache_hit"] = resp.from_cache
+    s["bytes"] = len(resp.content or b"")
 
     # Quick checks for non-200 responses
-    if resp.status_code != 200:
+    if resp.status_code not in (200, 304):
         logging.error("GDELT returned non-200 status: %s", resp.status_code)
         # log a short snippet of body for debugging
         text = resp.text or ""
         logging.error("GDELT body (first 1000 chars): %s", text[:1000])
         return []
 
+    return (articles or [])[:max_results]
+
+
+def _parse_gdelt_response(resp):
+    """Article dicts from a 200 artlist response, or None if it has no usable list."""
     data = _safe_json(resp)
     if not data:
         logging.error("GDELT response not JSON. Body (first 2000 chars):\n%s", resp.text[:2000])
-        return []
+        return None
 
     # GDELT's artlist response should include 'articles'
     articles = data.get("articles") or data.get("articleslist") or data.get("data") or None
@@ -64,10 +85,10 @@ def fetch_from_gdelt(keyword, max_results=12, timeout=20):
 
     if not articles:
         logging.error("No 'articles' found in GDELT response.")
-        return []
+        return None
 
     results = []
-    for art in articles[:max_results]:
+    for art in articles:
         # GDELT fields vary; be defensive
         title = art.get("title") or art.get("seentitle") or art.get("title_full") or ""
         published = art.get("seendate") or art.get("date") or art.get("published") or ""
@@ -77,7 +98,7 @@ def fetch_from_gdelt(keyword, max_results=12, timeout=20):
 
         results.append({
             "title": title,
-            "publishedAt": published,
+            "publishedAt": normalize_date(published, "gdelt") or published,
             "content": excerpt,
             "url": url,
             "source": domain
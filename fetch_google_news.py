@@ -2,24 +2,49 @@ import feedparser
 import html
 import urllib.parse
 
+import requests
+
+from dates import normalize_date
+from http_client import conditional_get
+from rate_limit import get_limiter
+from tracing import span
+
+GOOGLE_NEWS_RSS_URL = "https://news.google.com/rss/search"
+
+
+def _parse_feed(resp):
+    feed = feedparser.parse(resp.content)
+    return [
+        {
+            "title": html.unescape(entry.title),
+            "content": html.unescape(entry.summary),
+            "publishedAt": normalize_date(entry.get("published", ""), "rfc822") or entry.get("published", ""),
+            "url": entry.link,
+            "source": entry.get("source", {}).get("title", "Google News")
+        }
+        for entry in feed.entries
+    ]
+
+
 def fetch_google_news(query, max_results=10):
     """
     Fetches news from Google News RSS (free, unrestricted)
     """
 
     encoded = urllib.parse.quote(query)
-    url = f"https://news.google.com/rss/search?q={encoded}&hl=en-IN&gl=IN&ceid=IN:en"
+    url = f"{GOOGLE_NEWS_RSS_URL}?q={encoded}&hl=en-IN&gl=IN&ceid=IN:en"
 
-    feed = feedparser.parse(url)
+    with span("fetch.google_news", query=query) as s:
+        get_limiter("google_news").acquire()
+        try:
+            resp, articles = conditional_get(url, _parse_feed, timeout=15)
+        except requests.RequestException:
+            return []
+        s["status"] = resp.status_code
+        s["cache_hit"] = resp.from_cache
+        s["bytes"] = len(resp.content or b"")
 
-    articles = []
-    for entry in feed.entries[:max_results]:
-        articles.append({
-            "title": html.unescape(entry.title),
-            "content": html.unescape(entry.summary),
-            "publishedAt": entry.get("published", ""),
-            "url": entry.link,
-            "source": entry.get("source", {}).get("title", "Google News")
-        })
+        articles = (articles or [])[:max_results]
+        s["items"] = len(articles)
 
     return articles
@@ -1,22 +1,44 @@
 # fetch_news.py
 import os
-import requests
 from dotenv import load_dotenv
 import feedparser
-import requests
 from bs4 import BeautifulSoup
 from datetime import datetime
 from urllib.parse import urlparse
 from query_expander import expand_query_dynamically
+from dates import normalize_date
+from http_client import conditional_get, get_session
+from rate_limit import get_limiter
+from tracing import span
 
 load_dotenv()
 NEWSAPI_KEY = os.getenv("NEWSAPI_KEY")
+NEWSAPI_URL = "https://newsapi.org/v2/everything"
+
+
+def _parse_newsapi(resp):
+    data = resp.json()
+    if data.get("status") != "ok":
+        print("NEWSAPI ERROR:", data)
+        return None
+
+    articles = []
+    for a in data.get("articles", []):
+        articles.append({
+            "title": a.get("title"),
+            "content": a.get("content") or a.get("description", ""),
+            "url": a.get("url"),
+            "source": a.get("source", {}).get("name"),
+            "publishedAt": normalize_date(a.get("publishedAt"), "iso") or a.get("publishedAt")
+        })
+    return articles
+
 
 def fetch_from_newsapi(query, page_size=10):
     expanded_query = expand_query_dynamically(query)
 
     url = (
-        "https://newsapi.org/v2/everything?"
+        f"{NEWSAPI_URL}?"
         f"q={expanded_query}&"
         "searchIn=title,description&"
         "sortBy=relevancy&"
@@ -24,40 +46,44 @@ def fetch_from_newsapi(query, page_size=10):
         f"apiKey={NEWSAPI_KEY}"
     )
 
-    r = requests.get(url)
-    data = r.json()
+    with span("fetch.newsapi", query=query) as s:
+        get_limiter("newsapi").acquire()
+        r, articles = conditional_get(url, _parse_newsapi)
+        s["status"] = r.status_code
+        s["cache_hit"] = r.from_cache
+        s["bytes"] = len(r.content or b"")
 
-    if data.get("status") != "ok":
-        print("NEWSAPI ERROR:", data)
+    if articles is None:
+        if r.status_code not in (200, 304):
+            print("NEWSAPI ERROR:", r.status_code, r.text[:500])
         return []
 
-    articles = []
-    for a in data.get("articles", []):
-        articles.append({
-            "title": a.get("title"),
-            "content": a.get("content") or a.get("description", ""),
-            "url": a.get("url"),
-            "source": a.get("source", {}).get("name"),
-            "publishedAt": a.get("publishedAt")
-        })
-
     return articles
 
 
+def _parse_rss_entries(resp):
+    feed = feedparser.parse(resp.content)
+    return [
+        {k: entry.get(k) for k in ('title', 'link', 'published', 'updated', 'summary')}
+        for entry in feed.entries
+    ]
+
+
 def fetch_from_rss(feed_url, max_items=5):
-    feed = feedparser.parse(feed_url)
+    _, entries = conditional_get(feed_url, _parse_rss_entries)
     results = []
-    for entry in feed.entries[:max_items]:
+    for entry in (entries or [])[:max_items]:
         title = entry.get('title')
         link = entry.get('link')
         published = entry.get('published') or entry.get('updated') or ''
+        published = normalize_date(published, 'rfc822') or published
         # try to fetch content for more text
         try:
-            r = requests.get(link, timeout=8)
+            r = get_session().get(link, timeout=8)
             soup = BeautifulSoup(r.text, 'html.parser')
             text = soup.get_text(separator=' ', strip=True)[:3000]
         except Exception:
-            text = entry.get('summary', '')[:3000]
+            text = (entry.get('summary') or '')[:3000]
         source = urlparse(link).netloc
         results.append({
             'title': title,
@@ -1,23 +1,21 @@
-import requests
 from bs4 import BeautifulSoup
 from datetime import datetime
 
-def fetch_wikipedia_page(query):
-    search_url = (
-        "https://en.wikipedia.org/w/api.php?action=query&list=search&format=json&srsearch="
-        + query
-    )
+from http_client import conditional_get
+from rate_limit import get_limiter
+from tracing import span
 
-    r = requests.get(search_url, headers={"User-Agent": "Mozilla/5.0"})
-    data = r.json()
-    if "query" not in data or not data["query"]["search"]:
-        return []
+WIKIPEDIA_API_URL = "https://en.wikipedia.org/w/api.php"
+WIKIPEDIA_PAGE_URL = "https://en.wikipedia.org/wiki/"
+_HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+
+def _parse_json(resp):
+    return resp.json()
 
-    # best matching page
-    title = data["query"]["search"][0]["title"]
-    page_url = "https://en.wikipedia.org/wiki/" + title.replace(" ", "_")
 
-    html = requests.get(page_url, headers={"User-Agent": "Mozilla/5.0"}).text
+def _parse_page_text(resp):
+    html = resp.text
 
     # ---- parser fix ----
     try:
@@ -26,7 +24,38 @@ def fetch_wikipedia_page(query):
         soup = BeautifulSoup(html, "html.parser")
 
     paragraphs = soup.find_all("p")
-    content = " ".join([p.get_text(strip=True) for p in paragraphs])
+    return " ".join([p.get_text(strip=True) for p in paragraphs])
+
+
+def fetch_wikipedia_page(query):
+    with span("fetch.wikipedia", query=query) as s:
+        articles = _fetch_wikipedia_page(query, s)
+        s["items"] = len(articles)
+    return articles
+
+
+def _fetch_wikipedia_page(query, s):
+    search_url = (
+        WIKIPEDIA_API_URL + "?action=query&list=search&format=json&srsearch="
+        + query
+    )
+
+    get_limiter("wikipedia").acquire()
+    _, data = conditional_get(search_url, _parse_json, headers=_HEADERS)
+    if not data or "query" not in data or not data["query"]["search"]:
+        return []
+
+    # best matching page
+    title = data["query"]["search"][0]["title"]
+    page_url = WIKIPEDIA_PAGE_URL + title.replace(" ", "_")
+
+    get_limiter("wikipedia").acquire()
+    resp, content = conditional_get(page_url, _parse_page_text, headers=_HEADERS)
+    s["status"] = resp.status_code
+    s["cache_hit"] = resp.from_cache
+    s["bytes"] = len(resp.content or b"")
+    if content is None:
+        return []
 
     # Return as article format
     return [{
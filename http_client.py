@@ -0,0 +1,154 @@
+# http_client.py — one pooled requests.Session per process, plus conditional GET
+#
+# Every fetcher goes through get_session() so connections (and TLS handshakes)
+# to Google News, GDELT, NewsAPI and Wikipedia are reused across queries and
+# Streamlit reruns instead of being rebuilt on each call.
+#
+# conditional_get() adds an on-disk revalidation cache: responses carrying an
+# ETag or Last-Modified are stored as *parsed* data next to their validators;
+# the next request for the same URL sends If-None-Match / If-Modified-Since
+# and a 304 returns the stored data without downloading or re-parsing.
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from functools import lru_cache
+
+import requests
+from requests.adapters import HTTPAdapter
+
+USER_AGENT = "Mozilla/5.0 (compatible; AI-News-Orchestrator)"
+
+# HTTP_CACHE_DIR="" disables the revalidation cache
+HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", os.path.join("data", "http"))
+HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+_evict_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def get_session():
+    """The shared session. Connection pools are thread-safe, so threads may share it."""
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    s.headers["User-Agent"] = USER_AGENT
+    return s
+
+
+def reset_session():
+    """Close the shared session; the next get_session() builds a fresh one."""
+    if get_session.cache_info().currsize:
+        get_session().close()
+    get_session.cache_clear()
+
+
+def set_http_cache(directory, max_bytes=None):
+    """Point the revalidation cache elsewhere (None or "" disables it)."""
+    global HTTP_CACHE_DIR, HTTP_CACHE_MAX_BYTES
+    HTTP_CACHE_DIR = directory or ""
+    if max_bytes is not None:
+        HTTP_CACHE_MAX_BYTES = max_bytes
+
+
+# ---------------------------------------------------
+# Conditional GET
+# ---------------------------------------------------
+def _cache_path(url, params, parse):
+    # the parser is part of the key: the same URL parsed two ways is two entries
+    raw = json.dumps([url, sorted((params or {}).items()), f"{parse.__module__}.{parse.__qualname__}"],
+                     default=str)
+    return os.path.join(HTTP_CACHE_DIR, hashlib.sha1(raw.encode("utf-8")).hexdigest() + ".json")
+
+
+def _read_entry(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_entry(path, entry):
+    os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except (OSError, TypeError, ValueError) as e:
+        logging.warning("HTTP cache write failed: %s", e)
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return
+    _evict()
+
+
+def _evict():
+    """Drop least-recently-used entries until the cache fits HTTP_CACHE_MAX_BYTES."""
+    with _evict_lock:
+        try:
+            entries = []
+            for name in os.listdir(HTTP_CACHE_DIR):
+                if name.endswith(".json"):
+                    st = os.stat(os.path.join(HTTP_CACHE_DIR, name))
+                    entries.append((st.st_mtime, st.st_size, name))
+        except OSError:
+            return
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= HTTP_CACHE_MAX_BYTES:
+                break
+            try:
+                os.remove(os.path.join(HTTP_CACHE_DIR, name))
+            except OSError:
+                pass
+            total -= size
+
+
+def conditional_get(url, parse, params=None, headers=None, timeout=20):
+    """
+    GET url, revalidating against the on-disk cache.
+
+    parse(response) turns a 200 response into JSON-serializable data; it is
+    stored with the response's validators. Returns (response, data): data is
+    the fresh parse on 200, the stored parse on 304, and None otherwise.
+    response.from_cache is True when data was served from the cache.
+    Network errors propagate as requests.RequestException.
+    """
+    path = _cache_path(url, params, parse) if HTTP_CACHE_DIR else None
+    entry = _read_entry(path) if path else None
+
+    headers = dict(headers or {})
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    resp = get_session().get(url, params=params, headers=headers, timeout=timeout)
+    resp.from_cache = resp.status_code == 304 and entry is not None
+
+    if resp.from_cache:
+        try:
+            os.utime(path)   # LRU: mark as recently used
+        except OSError:
+            pass
+        return resp, entry["data"]
+    if resp.status_code != 200:
+        return resp, None
+
+    data = parse(resp)
+    etag = resp.headers.get("ETag")
+    last_modified = resp.headers.get("Last-Modified")
+    if path and data is not None and (etag or last_modified):
+        _write_entry(path, {
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": time.time(),
+            "data": data,
+        })
+    return resp, data
@@ -2,10 +2,24 @@ import google.generativeai as genai
 import os
 from dotenv import load_dotenv
 
+from model_router import STAGE_POLICIES, get_router, discover_models
+
 load_dotenv()
 
 genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
 
-print("Available Gemini Models:")
-for m in genai.list_models():
-    print("-", m.name)
+available = discover_models()
+print("Available Gemini Models (input / output token limits):")
+for name, (inp, out) in sorted(available.items()):
+    print("-", name, f"({inp} / {out})")
+
+router = get_router()
+router.sync_with_api(available)
+
+print("\nRouted models (cheapest first):")
+for m in sorted(router.models, key=lambda m: m.cost):
+    print(f"- {m.name}  tier={m.tier}  rpm={m.rpm:g}")
+
+print("\nFirst choice per stage (idle quotas, 2k-token prompt):")
+for stage in STAGE_POLICIES:
+    print(f"- {stage}: {router.route(stage, 2000)[0].name}")
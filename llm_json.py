@@ -0,0 +1,198 @@
+# llm_json.py — shared JSON extraction for LLM responses
+#
+# Model replies wrap JSON in ```fences```, lead with prose, trail with
+# "Let me know…" and sometimes stop mid-object. extract_json() finds the first
+# usable value in a linear scan, repairs truncated output where it can, and
+# coerce_records() validates list items against a small field schema.
+import copy
+import json
+import re
+
+_DECODER = json.JSONDecoder()
+_TOKENS = re.compile(r'[\[\]{}"\\]')
+_CLOSER = {"{": "}", "[": "]"}
+_TRAILING_COMMA = re.compile(r",\s*([\]}])")
+_MAX_REPAIR_CUTS = 25
+_MAX_RESCANS = 25
+
+
+# ---------------------------------------------------
+# 1. Bracket-balanced scanner
+# ---------------------------------------------------
+def scan_json_spans(text, pos=0):
+    """
+    Yield (start, end, open_state) for every top-level {...} / [...] span
+    from pos on. open_state is None for balanced spans; for a span cut off at
+    the end of the text it is (pending_closers, inside_string). Quotes outside
+    a span (prose) are ignored; a mismatched closer abandons the current span.
+    """
+    stack = []
+    start = None
+    in_str = False
+    skip = -1
+
+    for m in _TOKENS.finditer(text, pos):
+        i = m.start()
+        if i == skip:
+            continue
+        ch = m.group()
+
+        if in_str:
+            if ch == "\\":
+                skip = i + 1
+            elif ch == '"':
+                in_str = False
+            continue
+
+        if ch == '"':
+            in_str = bool(stack)
+        elif ch in "{[":
+            if not stack:
+                start = i
+            stack.append(_CLOSER[ch])
+        elif ch in "}]":
+            if not stack:
+                continue
+            if ch != stack[-1]:
+                stack.clear()
+                start = None
+                continue
+            stack.pop()
+            if not stack:
+                yield start, i + 1, None
+
+    if stack:
+        yield start, len(text), (list(stack), in_str)
+
+
+# ---------------------------------------------------
+# 2. Repair
+# ---------------------------------------------------
+def _close(fragment):
+    """Close an unterminated string and any open brackets in a fragment."""
+    spans = list(scan_json_spans(fragment))
+    if not spans or spans[-1][2] is None:
+        return fragment
+    pending, in_str = spans[-1][2]
+    out = fragment + ('"' if in_str else "")
+    out = out.rstrip().rstrip(",:")
+    return out + "".join(reversed(pending))
+
+
+def _loads_repaired(fragment):
+    # RecursionError: absurdly deep nesting ("[[[[…") is not worth repairing
+    try:
+        return json.loads(_TRAILING_COMMA.sub(r"\1", fragment))
+    except (ValueError, RecursionError):
+        pass
+
+    # Truncated output: close what is open, and if that is still invalid,
+    # cut back one element at a time (at the last comma) and try again.
+    cut = fragment
+    for _ in range(_MAX_REPAIR_CUTS):
+        candidate = _TRAILING_COMMA.sub(r"\1", _close(cut))
+        try:
+            return json.loads(candidate)
+        except (ValueError, RecursionError):
+            pos = cut.rfind(",")
+            if pos <= 0:
+                return None
+            cut = cut[:pos]
+    return None
+
+
+# ---------------------------------------------------
+# 3. Public API
+# ---------------------------------------------------
+def extract_json(text, expect=None, accept=None):
+    """
+    Return the first JSON value in text (optionally of type dict or list,
+    and passing the accept(value) check, e.g. records_of(...)), or None.
+    Tries a strict decode of each top-level span first, then a repaired
+    parse of the span. A span left open by a stray bracket in prose
+    ("see [1): {...}") is rescanned from just after that bracket.
+    """
+    if not text:
+        return None
+
+    def usable(value):
+        return (value is not None and (expect is None or isinstance(value, expect))
+                and (accept is None or accept(value)))
+
+    pos = 0
+    for _ in range(_MAX_RESCANS):
+        rescan = None
+        for start, end, open_state in scan_json_spans(text, pos):
+            if open_state is not None:
+                rescan = start + 1
+            if expect is dict and text[start] != "{":
+                continue
+            if expect is list and text[start] != "[":
+                continue
+
+            fragment = text[start:end]
+            if open_state is None:
+                try:
+                    value, _ = _DECODER.raw_decode(fragment)
+                except (ValueError, RecursionError):
+                    pass
+                else:
+                    if usable(value):
+                        return value
+                    continue
+
+            value = _loads_repaired(fragment)
+            if usable(value):
+                return value
+        if rescan is None:
+            return None
+        pos = rescan
+    return None
+
+
+def _coerce(value, typ, default):
+    if value is None:
+        return copy.copy(default)  # never hand out the shared list/dict default
+    if typ is bool:
+        if isinstance(value, str):
+            return value.strip().lower() in ("true", "yes", "1")
+        return bool(value)
+    if typ is float:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return default
+    if typ is list:
+        if isinstance(value, list):
+            return [str(v) for v in value if v not in (None, "")]
+        return [str(value)] if value != "" else []
+    if typ is str:
+        return value.strip() if isinstance(value, str) else str(value)
+    return value
+
+
+def coerce_record(item, fields):
+    """Coerce one dict to fields: name → (type, default). Unknown keys are dropped."""
+    return {name: _coerce(item.get(name), typ, default) for name, (typ, default) in fields.items()}
+
+
+def coerce_records(items, fields, required=()):
+    """
+    Validate a list of dicts against fields. Non-dict items and items missing
+    a required (non-empty) field are skipped.
+    """
+    if not isinstance(items, list):
+        return []
+    out = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        rec = coerce_record(item, fields)
+        if all(rec.get(r) not in (None, "", []) for r in required):
+            out.append(rec)
+    return out
+
+
+def records_of(fields, required=()):
+    """accept= check for extract_json: a list with at least one valid record."""
+    return lambda value: bool(coerce_records(value, fields, required))
@@ -1,14 +1,27 @@
 # llm_service.py (FINAL — Streamlit Deploy Safe, .env + secrets supported)
 
+import contextvars
 import json
-import re
 import time
 import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
 from typing import List, Dict, Any
 
 import google.generativeai as genai
 from dotenv import load_dotenv
 
+from claims import prefilter_event
+from evidence_index import EvidenceIndex
+from llm_json import extract_json, records_of
+from llm_types import TimelineEvent, TimelineSummary, CredibilityResult, DiscrepancyResult
+from local_llm import STANDIN_ENABLED, model_factory
+from model_router import estimate_tokens, get_router, is_rate_limit_error
+from rate_limit import get_limiter
+from story_index import verdict_key
+from tracing import span
+
 
 # ---------------------------------------------------
 # Load .env (local only)
@@ -37,6 +50,9 @@ def load_gemini_key():
     if not key:
         key = os.getenv("GEMINI_API_KEY")
 
+    if not key and STANDIN_ENABLED:
+        key = "offline-standin"
+
     if not key:
         raise RuntimeError(
             "GEMINI_API_KEY missing. "
@@ -50,8 +66,56 @@ API_KEY = load_gemini_key()
 genai.configure(api_key=API_KEY)
 
 
+# Default model (client warm-up); each stage is routed by model_router.get_router().
 GENIE_MODEL = "models/gemini-2.0-flash"
 
+# Anything with generate_content(prompt, generation_config=...) -> response(.text)
+# works here; GEMINI_STANDIN=1 selects local_llm.StandInModel, and benchmarks
+# swap in a canned model via set_model_factory().
+_model_factory = model_factory()
+
+
+def set_model_factory(factory=None):
+    """Replace the Gemini model constructor (None restores the default)."""
+    global _model_factory
+    _model_factory = factory or model_factory()
+    get_model.cache_clear()
+
+
+@lru_cache(maxsize=8)
+def get_model(name=GENIE_MODEL):
+    """One client per model name per process; generation_config is passed per call."""
+    return _model_factory(name)
+
+
+# ---------------------------------------------------
+# Deadline (set by pipeline's latency-budget mode)
+# ---------------------------------------------------
+_deadline = contextvars.ContextVar("llm_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+@contextmanager
+def llm_deadline(seconds):
+    """
+    Inside this block no Gemini call starts, and no retry backoff sleeps,
+    past `seconds` from now (None = no deadline). Propagates to worker
+    threads started with contextvars.copy_context().
+    """
+    token = _deadline.set(None if seconds is None else time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def _time_left():
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
 
 # ---------------------------------------------------
 # Retry wrapper
@@ -64,10 +128,11 @@ def retry_on_rate_limit(max_retries=5, backoff_factor=1.6, initial_wait=1.0):
                 try:
                     return fn(*args, **kwargs)
                 except Exception as e:
-                    msg = str(e).lower()
-                    is_rate = any(x in msg for x in ["quota", "429", "rate", "resourceexhausted"])
-                    if attempt == max_retries - 1 or not is_rate:
+                    if attempt == max_retries - 1 or not is_rate_limit_error(e) or isinstance(e, DeadlineExceeded):
                         raise
+                    left = _time_left()
+                    if left is not None and left <= wait:
+                        raise DeadlineExceeded("LLM deadline reached while backing off") from e
                     time.sleep(wait)
                     wait *= backoff_factor
             return fn(*args, **kwargs)
@@ -78,47 +143,65 @@ def retry_on_rate_limit(max_retries=5, backoff_factor=1.6, initial_wait=1.0):
 # ---------------------------------------------------
 # Helpers
 # ---------------------------------------------------
-def _normalize_text(text: str, max_len=32000):
-    if not text:
-        return ""
-    return text.strip()[:max_len]
+def _is_schema_rejection(e: Exception) -> bool:
+    msg = str(e).lower()
+    return "response_schema" in msg or "response_mime_type" in msg or "json mode" in msg
 
 
-def clean_timeline_json(raw: str) -> List[Dict[str, Any]]:
-    if not raw:
-        return []
-
-    cleaned = raw.replace("```json", "").replace("```", "")
-    arr_match = re.search(r"(\[[\s\S]*?\])", cleaned)
+def generate(stage: str, prompt: str, schema: Dict[str, Any] = None) -> str:
+    """
+    Single Gemini call for one pipeline stage. model_router picks the model
+    (and fails over when one is throttled); each model is paced by its own
+    rate limiter. With a schema the call uses structured output (JSON mode);
+    models that reject it are retried once in free-text mode.
+    """
+    left = _time_left()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(f"LLM deadline reached before {stage}")
+    with span(f"llm.{stage}", prompt_chars=len(prompt)) as s:
+        config = {"response_mime_type": "application/json", "response_schema": schema} if schema else None
+
+        def call(model_name):
+            model = get_model(model_name)
+            try:
+                return model.generate_content(prompt, generation_config=config)
+            except Exception as e:
+                if not config or not _is_schema_rejection(e):
+                    raise
+                s["schema_rejected"] = True
+                return model.generate_content(prompt)
+
+        overall_wait = get_limiter("gemini").acquire()
+        resp, info = get_router().run(stage, estimate_tokens(prompt), call)
+        s.update(info)
+        s["rate_wait_ms"] = round(info["rate_wait_ms"] + overall_wait * 1000, 3)
+        text = resp.text or ""
+        s["output_chars"] = len(text)
+        usage = getattr(resp, "usage_metadata", None)
+        if usage is not None:
+            s["prompt_tokens"] = getattr(usage, "prompt_token_count", 0) or 0
+            s["output_tokens"] = getattr(usage, "candidates_token_count", 0) or 0
+    return text
 
-    if not arr_match:
-        return []
 
-    try:
-        arr = json.loads(arr_match.group(1))
-    except:
-        return []
+def _normalize_text(text: str, max_len=32000):
+    if not text:
+        return ""
+    return text.strip()[:max_len]
 
-    final = []
-    for item in arr:
-        if not isinstance(item, dict):
-            continue
 
-        date = item.get("date", "Unknown")
-        event = item.get("event", "").strip()
-        date = re.sub(r"[^0-9\-]", "-", date)[:10]
+_TIMELINE_ITEMS = records_of(TimelineEvent.FIELDS, ("event",))
 
-        if event:
-            final.append({"date": date, "event": event})
 
-    return final
+def clean_timeline_json(raw: str) -> List[Dict[str, Any]]:
+    return [t.to_dict() for t in TimelineEvent.list_from(extract_json(raw, expect=list, accept=_TIMELINE_ITEMS))]
 
 
 # ---------------------------------------------------
 # 1) TIMELINE + SUMMARY (batch)
 # ---------------------------------------------------
 @retry_on_rate_limit()
-def batch_timeline_and_summary(articles: List[Dict[str, Any]], query: str = "") -> Dict[str, Any]:
+def batch_timeline_and_summary(articles: List[Dict[str, Any]], query: str = "") -> TimelineSummary:
 
     compact = []
     for a in articles[:20]:
@@ -140,7 +223,7 @@ You are an expert event analyst.
 
 2) Write a 3–6 sentence detailed summary paragraph.
 
-Return ONLY:
+Return JSON:
 {{
  "timeline": [...],
  "summary": "..."
@@ -152,33 +235,29 @@ ARTICLES:
 {payload}
     """
 
-    model = genai.GenerativeModel(GENIE_MODEL)
-    resp = model.generate_content(prompt)
-    text = resp.text or ""
+    text = generate("timeline", prompt, schema=TimelineSummary.SCHEMA)
 
-    obj_match = re.search(r"(\{[\s\S]*\})", text)
-    if obj_match:
-        try:
-            parsed = json.loads(obj_match.group(1))
-            raw_tl = json.dumps(parsed.get("timeline", []))
-            cleaned_tl = clean_timeline_json(raw_tl)
-            summary = parsed.get("summary", "").strip()
-            return {"timeline": cleaned_tl, "summary": summary}
-        except:
-            pass
+    with span("parse.timeline", chars=len(text)) as s:
+        parsed = extract_json(text, expect=dict, accept=lambda d: "timeline" in d or "summary" in d)
+        s["ok"] = parsed is not None
+        if parsed is not None:
+            return TimelineSummary.from_dict(parsed)
 
-    # fallback
-    return {
-        "timeline": clean_timeline_json(text),
-        "summary": text.strip()
-    }
+        # fallback: bare timeline array and/or plain-prose summary
+        return TimelineSummary(
+            timeline=TimelineEvent.list_from(extract_json(text, expect=list, accept=_TIMELINE_ITEMS)),
+            summary=text.strip()
+        )
 
 
 # ---------------------------------------------------
 # 2) LINK CREDIBILITY (batch)
 # ---------------------------------------------------
+NO_SCORE_REASON = "No score returned."
+
+
 @retry_on_rate_limit()
-def batch_evaluate_link_authenticity(articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def batch_evaluate_link_authenticity(articles: List[Dict[str, Any]]) -> List[CredibilityResult]:
 
     compact = []
     for a in articles[:30]:
@@ -201,90 +280,226 @@ For each article return JSON:
   "bias_label": "...",
   "reasoning": "..."
 }}
-Return ONLY a JSON array.
+Return a JSON array.
 ARTICLES:
 {payload}
 """
 
-    model = genai.GenerativeModel(GENIE_MODEL)
-    resp = model.generate_content(prompt)
-    raw = resp.text or ""
+    raw = generate("credibility", prompt, schema=CredibilityResult.LIST_SCHEMA)
 
-    try:
-        return json.loads(re.search(r"(\[[\s\S]*\])", raw).group(1))
-    except:
-        pass
+    with span("parse.credibility", chars=len(raw)) as s:
+        results = CredibilityResult.list_from(
+            extract_json(raw, expect=list, accept=records_of(CredibilityResult.FIELDS, ("url",)))
+        )
+        s["ok"] = bool(results)
 
-    # fallback neutral
-    return [
-        {
-            "url": a.get("url", ""),
-            "credibility_score": 0.6,
-            "authenticity_label": "unknown",
-            "bias_label": "unknown",
-            "reasoning": "Parsing failed."
-        }
-        for a in articles[:30]
-    ]
+    # neutral fallback only for articles the model skipped (or all, if unparseable)
+    scored = {r.url for r in results}
+    for a in articles[:30]:
+        url = a.get("url", "")
+        if url not in scored:
+            results.append(CredibilityResult(url=url, reasoning=NO_SCORE_REASON))
+    return results
 
 
 # ---------------------------------------------------
-# 3) DISCREPANCY CHECK
+# 3) DISCREPANCY CHECK (retrieval-scoped, sharded)
 # ---------------------------------------------------
-@retry_on_rate_limit()
-def batch_check_discrepancies(timeline, articles):
+# Events per Gemini call, parallel calls, and evidence passages per event.
+DISCREPANCY_SHARD_SIZE = int(os.getenv("DISCREPANCY_SHARD_SIZE", "3"))
+DISCREPANCY_WORKERS = int(os.getenv("DISCREPANCY_WORKERS", "4"))
+EVIDENCE_PER_EVENT = int(os.getenv("EVIDENCE_PER_EVENT", "6"))
+# Resolve events whose figures/dates agree locally (claims.py) without Gemini.
+CLAIM_PREFILTER = os.getenv("CLAIM_PREFILTER", "1") != "0"
+
+
+class DiscrepancyCheckIncomplete(RuntimeError):
+    """Some events got no verdict; .results still holds every event (placeholders included)."""
 
-    t_json = json.dumps(timeline, indent=2, ensure_ascii=False)
-    a_json = json.dumps([
+    def __init__(self, message, results):
+        super().__init__(message)
+        self.results = results
+
+
+def _discrepancy_placeholder(t, reason="Parsing error") -> DiscrepancyResult:
+    return DiscrepancyResult(
+        date=t.get("date", ""),
+        event=t.get("event", ""),
+        is_consistent=False,
+        discrepancies=[reason],
+        severity="medium"
+    )
+
+
+@retry_on_rate_limit()
+def _check_discrepancy_shard(shard: List[Dict[str, Any]]) -> List[Any]:
+    """
+    One Gemini call for a few events, each with its own evidence passages.
+    Returns one entry per shard event, in shard order: its DiscrepancyResult,
+    or None if the model dropped it.
+    """
+    payload = json.dumps([
         {
-            "title": a.get("title", ""),
-            "url": a.get("url", ""),
-            "source": a.get("source", ""),
-            "publishedAt": a.get("publishedAt", ""),
-            "snippet": _normalize_text(a.get("content", ""), max_len=800)
+            "date": e["date"],
+            "event": e["event"],
+            "evidence": [
+                {"source": p["source"], "publishedAt": p["publishedAt"], "text": p["text"]}
+                for p in e["evidence"]
+            ],
         }
-        for a in articles[:30]
+        for e in shard
     ], indent=2, ensure_ascii=False)
 
     prompt = f"""
-For each timeline event return:
+Each timeline event below comes with EVIDENCE passages from different sources.
+Using ONLY that event's evidence, return for each event:
+- date and event (copied from the input)
 - is_consistent
 - agreement_points
-- discrepancies
+- discrepancies (conflicting numbers, dates, outcomes or descriptions, naming the sources)
 - severity
-Return ONLY a JSON array.
+Return a JSON array, one item per event, in input order.
 TIMELINE:
-{t_json}
-ARTICLES:
-{a_json}
+{payload}
 """
 
-    model = genai.GenerativeModel(GENIE_MODEL)
-    resp = model.generate_content(prompt)
-    raw = resp.text or ""
-
-    try:
-        return json.loads(re.search(r"(\[[\s\S]*\])", raw).group(1))
-    except:
-        pass
-
-    return [
-        {
-            "date": t.get("date"),
-            "event": t.get("event"),
-            "is_consistent": False,
-            "agreement_points": [],
-            "discrepancies": ["Parsing error"],
-            "severity": "medium"
-        }
-        for t in timeline
-    ]
-
-
+    raw = generate("discrepancies", prompt, schema=DiscrepancyResult.LIST_SCHEMA)
 
+    with span("parse.discrepancies", chars=len(raw), events=len(shard)) as s:
+        results = DiscrepancyResult.list_from(
+            extract_json(raw, expect=list, accept=records_of(DiscrepancyResult.FIELDS))
+        )
+        s["ok"] = bool(results)
+        matched = _match_to_events(results, shard)
+        s["dropped"] = matched.count(None)
 
+    for item, t in zip(matched, shard):
+        if item is not None:
+            item.date = item.date or t.get("date", "")
+            item.event = item.event or t.get("event", "")
+    return matched
 
 
+def _event_key(text):
+    return " ".join(text.lower().split())
 
 
+def _match_to_events(results, shard):
+    """
+    Pair results with shard events by their copied "event" text. Position is
+    only trusted when the model returned exactly one item per event — once an
+    item is dropped, positions no longer line up.
+    """
+    matched = [None] * len(shard)
+    slots = {}
+    for i, t in enumerate(shard):
+        slots.setdefault(_event_key(t.get("event", "")), []).append(i)
+
+    unmatched = []
+    for j, item in enumerate(results):
+        free = slots.get(_event_key(item.event)) if item.event else None
+        if free:
+            matched[free.pop(0)] = item
+        else:
+            unmatched.append((j, item))
+
+    if len(results) == len(shard):
+        for j, item in unmatched:
+            if matched[j] is None:
+                matched[j] = item
+    return matched
+
+
+def build_event_evidence(timeline, articles, k=EVIDENCE_PER_EVENT, index=None):
+    """Attach the top-k BM25 passages for each timeline event."""
+    with span("retrieve.evidence", events=len(timeline)) as s:
+        index = index or EvidenceIndex(articles)
+        s["passages"] = len(index)
+        return [
+            {
+                "date": t.get("date", ""),
+                "event": t.get("event", ""),
+                "evidence": index.search(t.get("event", ""), k=k),
+            }
+            for t in timeline
+        ]
+
+
+def batch_check_discrepancies(timeline, articles, store=None) -> List[DiscrepancyResult]:
+    """
+    Check every timeline event against only the passages that mention it.
+    Events whose figures and dates already agree across sources are resolved
+    locally; the rest are grouped into shards of DISCREPANCY_SHARD_SIZE that
+    run in parallel. A failed shard degrades to placeholders for its events,
+    and DiscrepancyCheckIncomplete (carrying all results) is raised at the end
+    if any shard failed or the model returned no usable verdict at all.
+
+    With a store (story_index.StoryIndex), events already checked on the same
+    evidence reuse their stored verdict, and fresh Gemini verdicts are saved.
+    """
+    if not timeline:
+        return []
 
+    events = build_event_evidence(timeline, articles)
+
+    results = [None] * len(events)
+    keys = [verdict_key(e) for e in events] if store is not None else []
+    if store is not None:
+        with span("story.verdicts", events=len(events)) as s:
+            stored = store.load_verdicts(keys)
+            for i, key in enumerate(keys):
+                if key in stored:
+                    results[i] = DiscrepancyResult.from_dict(stored[key])
+            s["reused"] = len(stored)
+
+    if CLAIM_PREFILTER:
+        entities_by_url = {a.get("url", ""): a.get("entities") or [] for a in articles}
+        with span("claims.prefilter", events=len(events)) as s:
+            for i, e in enumerate(events):
+                if results[i] is not None:
+                    continue
+                verdict = prefilter_event(e, entities_by_url)
+                if verdict is not None:
+                    results[i] = DiscrepancyResult(date=e["date"], event=e["event"], **verdict)
+            s["resolved"] = sum(r is not None for r in results)
+
+    pending = [i for i, r in enumerate(results) if r is None]
+    if not pending:
+        return results
+
+    size = max(1, DISCREPANCY_SHARD_SIZE)
+    shards = [[events[i] for i in pending[j:j + size]] for j in range(0, len(pending), size)]
+
+    errors = []
+
+    def run(shard):
+        # one entry per event: (result, is_verdict) — placeholders are not worth storing
+        try:
+            checked = _check_discrepancy_shard(shard)
+        except Exception as e:
+            errors.append(e)
+            return [(_discrepancy_placeholder(t, f"Check failed: {e}"), False) for t in shard]
+        return [(item, True) if item is not None else (_discrepancy_placeholder(t), False)
+                for item, t in zip(checked, shard)]
+
+    if len(shards) == 1:
+        outcomes = [run(shards[0])]
+    else:
+        # copy_context keeps tracing spans attached to the caller's trace
+        with ThreadPoolExecutor(max_workers=min(DISCREPANCY_WORKERS, len(shards))) as pool:
+            futures = [pool.submit(contextvars.copy_context().run, run, shard) for shard in shards]
+            outcomes = [f.result() for f in futures]
+
+    fresh = {}
+    for i, (item, is_verdict) in zip(pending, (entry for outcome in outcomes for entry in outcome)):
+        results[i] = item
+        if is_verdict and store is not None:
+            fresh[keys[i]] = item.to_dict()
+    if fresh:
+        store.save_verdicts(fresh)
+
+    if errors:
+        raise DiscrepancyCheckIncomplete(f"{len(errors)} of {len(shards)} check(s) failed: {errors[0]}", results)
+    if not any(is_verdict for outcome in outcomes for _, is_verdict in outcome):
+        raise DiscrepancyCheckIncomplete("no usable verdicts returned", results)
+    return results
@@ -0,0 +1,149 @@
+# llm_types.py — typed LLM results + the JSON schemas Gemini is asked to follow
+import re
+from dataclasses import dataclass, field, asdict
+from typing import List
+
+from llm_json import coerce_record, coerce_records
+
+
+def _schema(properties, required):
+    return {"type": "OBJECT", "properties": properties, "required": list(required)}
+
+
+def _array(item_schema):
+    return {"type": "ARRAY", "items": item_schema}
+
+
+_STR = {"type": "STRING"}
+_STR_LIST = _array(_STR)
+
+
+# ---------------------------------------------------
+# Timeline + summary
+# ---------------------------------------------------
+@dataclass
+class TimelineEvent:
+    date: str
+    event: str
+
+    FIELDS = {"date": (str, "Unknown"), "event": (str, "")}
+    SCHEMA = _schema({"date": _STR, "event": _STR}, ("date", "event"))
+
+    @classmethod
+    def list_from(cls, items) -> List["TimelineEvent"]:
+        out = []
+        for rec in coerce_records(items, cls.FIELDS, required=("event",)):
+            out.append(cls(date=re.sub(r"[^0-9\-]", "-", rec["date"])[:10], event=rec["event"]))
+        return out
+
+    def to_dict(self):
+        return asdict(self)
+
+
+@dataclass
+class TimelineSummary:
+    timeline: List[TimelineEvent] = field(default_factory=list)
+    summary: str = ""
+
+    SCHEMA = _schema(
+        {"timeline": _array(TimelineEvent.SCHEMA), "summary": _STR},
+        ("timeline", "summary")
+    )
+
+    @classmethod
+    def from_dict(cls, d):
+        summary = d.get("summary", "")
+        return cls(
+            timeline=TimelineEvent.list_from(d.get("timeline", [])),
+            summary=summary.strip() if isinstance(summary, str) else ""
+        )
+
+    def to_dict(self):
+        return {"timeline": [t.to_dict() for t in self.timeline], "summary": self.summary}
+
+
+# ---------------------------------------------------
+# Link credibility
+# ---------------------------------------------------
+@dataclass
+class CredibilityResult:
+    url: str
+    credibility_score: float = 0.6
+    authenticity_label: str = "unknown"
+    bias_label: str = "unknown"
+    reasoning: str = ""
+
+    FIELDS = {
+        "url": (str, ""),
+        "credibility_score": (float, 0.6),
+        "authenticity_label": (str, "unknown"),
+        "bias_label": (str, "unknown"),
+        "reasoning": (str, ""),
+    }
+    SCHEMA = _schema(
+        {
+            "url": _STR,
+            "credibility_score": {"type": "NUMBER"},
+            "authenticity_label": _STR,
+            "bias_label": _STR,
+            "reasoning": _STR,
+        },
+        ("url", "credibility_score", "authenticity_label", "bias_label", "reasoning")
+    )
+    LIST_SCHEMA = _array(SCHEMA)
+
+    @classmethod
+    def list_from(cls, items) -> List["CredibilityResult"]:
+        out = []
+        for rec in coerce_records(items, cls.FIELDS, required=("url",)):
+            rec["credibility_score"] = min(1.0, max(0.0, rec["credibility_score"]))
+            out.append(cls(**rec))
+        return out
+
+    def to_dict(self):
+        return asdict(self)
+
+
+# ---------------------------------------------------
+# Discrepancy check
+# ---------------------------------------------------
+@dataclass
+class DiscrepancyResult:
+    date: str = ""
+    event: str = ""
+    is_consistent: bool = False
+    agreement_points: List[str] = field(default_factory=list)
+    discrepancies: List[str] = field(default_factory=list)
+    severity: str = "medium"
+
+    FIELDS = {
+        "date": (str, ""),
+        "event": (str, ""),
+        "is_consistent": (bool, False),
+        "agreement_points": (list, []),
+        "discrepancies": (list, []),
+        "severity": (str, "medium"),
+    }
+    SCHEMA = _schema(
+        {
+            "date": _STR,
+            "event": _STR,
+            "is_consistent": {"type": "BOOLEAN"},
+            "agreement_points": _STR_LIST,
+            "discrepancies": _STR_LIST,
+            "severity": {"type": "STRING", "enum": ["low", "medium", "high"]},
+        },
+        ("is_consistent", "agreement_points", "discrepancies", "severity")
+    )
+    LIST_SCHEMA = _array(SCHEMA)
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(**coerce_record(d if isinstance(d, dict) else {}, cls.FIELDS))
+
+    @classmethod
+    def list_from(cls, items) -> List["DiscrepancyResult"]:
+        return [cls(**rec) for rec in coerce_records(items, cls.FIELDS)]
+
+    def to_dict(self):
+        return asdict(self)
@@ -0,0 +1,260 @@
+# model_router.py — route each LLM stage to a Gemini model by payload size and observed health
+#
+# Every Gemini model has its own quota, latency and context window. The router
+# keeps rolling stats per model (latency, errors, throttles) and, for each
+# call, orders the models that can take the payload: the cheapest one whose
+# expected wait + latency fits ROUTE_MAX_ETA_S ("cheapest" stages), or the one
+# expected to answer first ("fastest" stages). A throttled model is put on a
+# cooldown and the call fails over to the next model, so one exhausted quota
+# no longer stalls the whole card.
+#
+#   GEMINI_MODELS=models/gemini-2.0-flash        # pin every stage to one model
+#   GEMINI_2_5_FLASH_RPM=5                       # per-model request budget
+import os
+import re
+import statistics
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+
+from rate_limit import get_limiter
+
+ROUTE_MAX_ETA_S = float(os.getenv("ROUTE_MAX_ETA_S", "12"))
+MAX_FAILOVERS = int(os.getenv("ROUTE_MAX_FAILOVERS", "2"))
+COOLDOWN_S = 20.0
+MAX_COOLDOWN_S = 300.0
+STATS_WINDOW_S = float(os.getenv("ROUTE_STATS_WINDOW_S", "300"))   # older calls no longer count
+PROBE_AFTER_S = float(os.getenv("ROUTE_PROBE_AFTER_S", "30"))      # retry a failing model after this
+
+
+try:
+    from google.api_core.exceptions import ResourceExhausted, TooManyRequests
+    _RATE_LIMIT_TYPES = (ResourceExhausted, TooManyRequests)
+except ImportError:
+    _RATE_LIMIT_TYPES = ()
+
+# word-bounded, so "GenerateContentRequest" or "moderate" never count as throttling
+_RATE_LIMIT_MSG = re.compile(r"\b429\b|\bquota\b|\brate.?limit|resource.?(?:has been )?exhausted", re.I)
+
+
+def is_rate_limit_error(e):
+    return isinstance(e, _RATE_LIMIT_TYPES) or bool(_RATE_LIMIT_MSG.search(str(e)))
+
+
+def estimate_tokens(text):
+    return len(text) // 4 + 1
+
+
+@dataclass
+class ModelSpec:
+    name: str
+    tier: int                  # capability: 0 lite, 1 flash, 2 newer flash
+    cost: int                  # relative price; lower is cheaper
+    rpm: float                 # default request budget
+    input_token_limit: int = 1_048_576
+    output_token_limit: int = 8192
+    latency_s: float = 3.0     # prior until real calls are observed
+
+    @property
+    def limiter_name(self):
+        # "models/gemini-2.0-flash" → "gemini_2_0_flash" (env GEMINI_2_0_FLASH_RPM)
+        return self.name.split("/")[-1].replace("-", "_").replace(".", "_")
+
+
+DEFAULT_MODELS = [
+    ModelSpec("models/gemini-2.0-flash-lite", tier=0, cost=0, rpm=30, latency_s=1.5),
+    ModelSpec("models/gemini-2.0-flash", tier=1, cost=1, rpm=15, latency_s=2.5),
+    ModelSpec("models/gemini-2.5-flash", tier=2, cost=2, rpm=10, output_token_limit=65536, latency_s=5.0),
+]
+
+
+@dataclass
+class StagePolicy:
+    prefer: str                # "cheapest" or "fastest"
+    min_tier: int
+    output_tokens: int         # expected answer size, must fit the model's output limit
+
+
+STAGE_POLICIES = {
+    "timeline": StagePolicy("fastest", 1, 2048),          # user-facing: first answer wins
+    "credibility": StagePolicy("cheapest", 0, 4096),      # per-URL labels; lite is enough
+    "discrepancies": StagePolicy("cheapest", 1, 2048),
+    "event_discrepancy": StagePolicy("cheapest", 2, 1024),
+}
+DEFAULT_POLICY = StagePolicy("cheapest", 1, 2048)
+
+
+class ModelStats:
+    """Rolling window of recent calls for one model (last `window` calls, at most STATS_WINDOW_S old)."""
+
+    def __init__(self, window=50):
+        self.calls = deque(maxlen=window)     # (at, latency_s, outcome): "ok" | "error" | "throttled"
+        self.cooldown_until = 0.0
+        self.throttle_streak = 0
+
+    def record(self, latency, outcome):
+        self.calls.append((time.monotonic(), latency, outcome))
+        if outcome == "throttled":
+            self.throttle_streak += 1
+            self.cooldown_until = time.monotonic() + min(MAX_COOLDOWN_S, COOLDOWN_S * 2 ** (self.throttle_streak - 1))
+        elif outcome == "ok":
+            self.throttle_streak = 0
+            self.cooldown_until = 0.0
+
+    def _recent(self):
+        horizon = time.monotonic() - STATS_WINDOW_S
+        return [c for c in self.calls if c[0] >= horizon]
+
+    def latency(self, prior):
+        ok = [lat for _, lat, outcome in self._recent() if outcome == "ok"]
+        return statistics.median(ok) if ok else prior
+
+    def rate(self, outcome):
+        recent = self._recent()
+        return sum(1 for *_, o in recent if o == outcome) / len(recent) if recent else 0.0
+
+    def healthy(self, now):
+        """
+        Off cooldown and not failing. A failing model (half its recent calls
+        errors, including the last one) is let through again once it has been
+        idle PROBE_AFTER_S, so a single success can bring it back.
+        """
+        if self.cooldown_until > now:
+            return False
+        if not self.calls or self.calls[-1][2] != "error" or self.rate("error") < 0.5:
+            return True
+        return now - self.calls[-1][0] >= PROBE_AFTER_S
+
+
+class ModelRouter:
+    def __init__(self, models=None):
+        self.models = list(models or DEFAULT_MODELS)
+        self.stats = {m.name: ModelStats() for m in self.models}
+        self._lock = threading.Lock()
+
+    def limiter(self, spec):
+        return get_limiter(spec.limiter_name, default_rpm=spec.rpm)
+
+    def eta(self, spec):
+        """Expected seconds until an answer: queue wait for the quota + typical latency."""
+        return self.limiter(spec).expected_wait() + self.stats[spec.name].latency(spec.latency_s)
+
+    def route(self, stage, prompt_tokens):
+        """Models to try for one call, best first (at most 1 + MAX_FAILOVERS)."""
+        policy = STAGE_POLICIES.get(stage, DEFAULT_POLICY)
+        with self._lock:
+            fits = [
+                m for m in self.models
+                if prompt_tokens + policy.output_tokens <= m.input_token_limit
+                and policy.output_tokens <= m.output_token_limit
+            ] or [max(self.models, key=lambda m: m.input_token_limit)]
+            # prefer the stage's tier; fall back to lower tiers only when none qualify
+            capable = [m for m in fits if m.tier >= policy.min_tier] or fits
+
+            now = time.monotonic()
+            healthy = [m for m in capable if self.stats[m.name].healthy(now)]
+            cooling = sorted((m for m in capable if m not in healthy),
+                             key=lambda m: self.stats[m.name].cooldown_until)
+
+            etas = {m.name: self.eta(m) for m in healthy}
+            by_eta = sorted(healthy, key=lambda m: etas[m.name])
+            if policy.prefer == "cheapest":
+                in_budget = sorted((m for m in healthy if etas[m.name] <= ROUTE_MAX_ETA_S), key=lambda m: m.cost)
+                ordered = in_budget + [m for m in by_eta if m not in in_budget]
+            else:
+                ordered = by_eta
+        return (ordered + cooling)[:1 + MAX_FAILOVERS]
+
+    def record(self, spec, latency, outcome):
+        with self._lock:
+            self.stats[spec.name].record(latency, outcome)
+
+    def run(self, stage, prompt_tokens, call):
+        """
+        call(model_name) on the routed models until one succeeds. Throttled
+        models are cooled down and the next one is tried; other errors are
+        recorded and raised. Returns (result, info) where info has the model
+        used, the number of failovers and the quota wait in ms.
+        """
+        waited = 0.0
+        last_error = None
+        failovers = 0
+        for spec in self.route(stage, prompt_tokens):
+            waited += self.limiter(spec).acquire()
+            t0 = time.monotonic()
+            try:
+                result = call(spec.name)
+            except Exception as e:
+                if is_rate_limit_error(e):
+                    self.record(spec, time.monotonic() - t0, "throttled")
+                    last_error = e
+                    failovers += 1
+                    continue
+                self.record(spec, time.monotonic() - t0, "error")
+                raise
+            self.record(spec, time.monotonic() - t0, "ok")
+            return result, {"model": spec.name, "failovers": failovers, "rate_wait_ms": round(waited * 1000, 3)}
+        raise last_error
+
+    def sync_with_api(self, available):
+        """
+        Keep only models the API key can use and adopt their real token limits.
+        available: {name: (input_token_limit, output_token_limit)}, see discover_models().
+        """
+        with self._lock:
+            kept = [m for m in self.models if m.name in available] or self.models
+            for m in kept:
+                if m.name in available:
+                    m.input_token_limit, m.output_token_limit = available[m.name]
+            self.models = kept
+
+    def snapshot(self):
+        """Per-model stats for debug views."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "model": m.name,
+                    "calls": len(self.stats[m.name]._recent()),
+                    "latency_s": round(self.stats[m.name].latency(m.latency_s), 3),
+                    "error_rate": round(self.stats[m.name].rate("error"), 3),
+                    "throttle_rate": round(self.stats[m.name].rate("throttled"), 3),
+                    "cooldown_s": round(max(0.0, self.stats[m.name].cooldown_until - now), 1),
+                    "queue_wait_s": round(self.limiter(m).expected_wait(), 3),
+                }
+                for m in self.models
+            ]
+
+
+def discover_models():
+    """{name: (input_token_limit, output_token_limit)} for models supporting generateContent."""
+    import google.generativeai as genai
+    return {
+        m.name: (m.input_token_limit, m.output_token_limit)
+        for m in genai.list_models()
+        if "generateContent" in getattr(m, "supported_generation_methods", [])
+    }
+
+
+def _configured_models():
+    names = [n.strip() for n in os.getenv("GEMINI_MODELS", "").split(",") if n.strip()]
+    if not names:
+        return [ModelSpec(**vars(m)) for m in DEFAULT_MODELS]
+    known = {m.name: m for m in DEFAULT_MODELS}
+    # unknown names are treated as flash-class models, cheapest first in the given order
+    return [ModelSpec(**vars(known[n])) if n in known else ModelSpec(n, tier=1, cost=i, rpm=15)
+            for i, n in enumerate(names)]
+
+
+@lru_cache(maxsize=1)
+def get_router():
+    """The process-wide router. GEMINI_DISCOVER_MODELS=1 checks the model list with the API once."""
+    router = ModelRouter(_configured_models())
+    if os.getenv("GEMINI_DISCOVER_MODELS") == "1":
+        try:
+            router.sync_with_api(discover_models())
+        except Exception:
+            pass
+    return router
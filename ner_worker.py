@@ -0,0 +1,190 @@
+# ner_worker.py — shared NER inference worker with dynamic cross-request batching
+#
+# One process holds the only copy of the BERT-NER model. Streamlit sessions
+# and batch workers connect over a local socket; the worker gathers their
+# requests into batches (up to --max-batch texts or --max-wait-ms, whichever
+# comes first) and runs them through the model together.
+#
+#   export NER_WORKER_AUTHKEY=$(python -c "import secrets; print(secrets.token_hex(32))")
+#   python ner_worker.py --address 127.0.0.1:6010
+#   NER_WORKER_ADDRESS=127.0.0.1:6010 streamlit run app.py
+#
+# The address may also be a filesystem path (Unix domain socket).
+# multiprocessing connections unpickle what they receive, so the shared
+# secret NER_WORKER_AUTHKEY is mandatory: whoever knows it can run code in
+# the worker. There is deliberately no default.
+import argparse
+import logging
+import os
+import queue
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+
+from nlp import load_local_ner, to_entities
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+
+def authkey_from_env():
+    """NER_WORKER_AUTHKEY as bytes; raises ValueError when it is not set."""
+    key = os.getenv("NER_WORKER_AUTHKEY", "")
+    if not key:
+        raise ValueError("NER_WORKER_AUTHKEY is not set; worker and clients need the same secret key")
+    return key.encode()
+
+
+def parse_address(address):
+    """'host:port' → (host, port); anything containing '/' is a Unix socket path."""
+    if "/" in address:
+        return address
+    host, _, port = address.rpartition(":")
+    return (host or "127.0.0.1", int(port))
+
+
+# ---------------------------------------------------
+# Server
+# ---------------------------------------------------
+class NERWorker:
+    def __init__(self, ner, max_batch=32, max_wait_ms=10):
+        self.ner = ner
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._requests = queue.Queue()
+        self.batches = 0
+        self.texts = 0
+
+    def _gather(self):
+        """Block for one request, then keep collecting until the batch is full or the window closes."""
+        first = self._requests.get()
+        batch = [first]
+        n = len(first[2])
+        deadline = time.monotonic() + self.max_wait
+        while n < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            n += len(item[2])
+        return batch
+
+    def _batch_loop(self):
+        while True:
+            batch = self._gather()
+            texts = [t for _, _, req_texts in batch for t in req_texts]
+            try:
+                results = self.ner(texts, batch_size=self.max_batch) if texts else []
+                error = None
+            except Exception as e:
+                results, error = [], f"{type(e).__name__}: {e}"
+            self.batches += 1
+            self.texts += len(texts)
+
+            offset = 0
+            for reply, req_id, req_texts in batch:
+                if error:
+                    reply((req_id, None, error))
+                else:
+                    chunk = results[offset:offset + len(req_texts)]
+                    reply((req_id, [to_entities(r) for r in chunk], None))
+                offset += len(req_texts)
+
+    def _serve_connection(self, conn):
+        send_lock = threading.Lock()
+
+        def reply(msg):
+            with send_lock:
+                try:
+                    conn.send(msg)
+                except (OSError, EOFError):
+                    pass
+
+        try:
+            while True:
+                req_id, texts = conn.recv()
+                self._requests.put((reply, req_id, texts))
+        except (EOFError, OSError):
+            pass
+        finally:
+            conn.close()
+
+    def serve_forever(self, address, authkey):
+        if not authkey:
+            raise ValueError("refusing to listen without an authkey")
+        threading.Thread(target=self._batch_loop, daemon=True).start()
+        with Listener(parse_address(address), backlog=128, authkey=authkey) as listener:
+            logging.info("NER worker listening on %s (max_batch=%s, max_wait=%.0f ms)",
+                         address, self.max_batch, self.max_wait * 1000)
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    logging.warning("NER worker rejected a connection: %s", e)
+                    continue
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+
+
+# ---------------------------------------------------
+# Client (used by nlp.py when NER_WORKER_ADDRESS is set)
+# ---------------------------------------------------
+class NERClient:
+    """
+    Thread-safe client: each thread keeps its own connection so concurrent
+    callers in one process still land in the worker's batches independently.
+    """
+
+    def __init__(self, address, authkey=None, timeout=30.0):
+        self.address = parse_address(address)
+        self.authkey = authkey or authkey_from_env()
+        self.timeout = timeout
+        self._local = threading.local()
+        self._ids = iter(range(1, 1 << 62))
+        self._id_lock = threading.Lock()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = Client(self.address, authkey=self.authkey)
+        return conn
+
+    def annotate(self, texts):
+        """Entities for each (non-empty) text, in order: [[{"text", "label"}, ...], ...]."""
+        with self._id_lock:
+            req_id = next(self._ids)
+        conn = self._conn()
+        try:
+            conn.send((req_id, list(texts)))
+            if not conn.poll(self.timeout):
+                raise TimeoutError(f"NER worker did not answer within {self.timeout}s")
+            got_id, results, error = conn.recv()
+        except Exception:
+            self._local.conn = None
+            conn.close()
+            raise
+        if error:
+            raise RuntimeError(f"NER worker error: {error}")
+        if got_id != req_id:
+            raise RuntimeError("NER worker reply out of order")
+        return results
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Shared BERT-NER inference worker.")
+    ap.add_argument("--address", default=os.getenv("NER_WORKER_ADDRESS", "127.0.0.1:6010"))
+    ap.add_argument("--max-batch", type=int, default=32, help="max texts per model call")
+    ap.add_argument("--max-wait-ms", type=float, default=10, help="batching window after the first request")
+    args = ap.parse_args(argv)
+    try:
+        authkey = authkey_from_env()
+    except ValueError as e:
+        ap.error(str(e))
+
+    NERWorker(load_local_ner(), args.max_batch, args.max_wait_ms).serve_forever(args.address, authkey)
+
+
+if __name__ == "__main__":
+    main()
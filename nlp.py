@@ -1,25 +1,85 @@
 # nlp.py — Streamlit-safe lightweight NER
+#
+# The model is loaded lazily, once per process. If NER_WORKER_ADDRESS is set,
+# inference goes to the shared worker (ner_worker.py) instead, so sessions do
+# not each hold a model copy; if the worker is unreachable we fall back to the
+# local model.
+import logging
+import os
+from collections import defaultdict
+from functools import lru_cache
 
-from transformers import pipeline
-from dateparser import parse as parse_date
+from chunking import batched, iter_windows, merge_window_entities
+from dates import parse_natural_date
+
+NER_WORKER_ADDRESS = os.getenv("NER_WORKER_ADDRESS")
+MAX_WINDOWS_PER_CALL = int(os.getenv("NER_MAX_WINDOWS_PER_CALL", "32"))
+
+
+@lru_cache(maxsize=1)
+def load_local_ner():
+    # Load lightweight NER model (works on Streamlit Cloud)
+    from transformers import pipeline
+    return pipeline("ner", model="dslim/bert-base-NER", aggregation_strategy="simple")
+
+
+@lru_cache(maxsize=1)
+def _worker_client():
+    from ner_worker import NERClient
+    return NERClient(NER_WORKER_ADDRESS)
+
+
+def to_entities(result):
+    # character offsets are kept so chunked documents can be merged (see chunking.py)
+    return [
+        {"text": ent["word"], "label": ent["entity_group"],
+         **({"start": ent["start"], "end": ent["end"]} if "start" in ent else {})}
+        for ent in result
+    ]
+
+
+def _infer(batch):
+    if NER_WORKER_ADDRESS:
+        try:
+            return _worker_client().annotate(batch)
+        except Exception as e:
+            logging.warning("NER worker unavailable (%s); using local model", e)
+    return [to_entities(r) for r in load_local_ner()(batch)]
+
+
+def annotate_texts(texts):
+    """
+    Entities for many texts in batched model (or worker) calls. Long texts
+    are split into overlapping word windows; at most MAX_WINDOWS_PER_CALL
+    windows go through the model at once, whatever the document sizes.
+    """
+    texts = list(texts)
+    out = [[] for _ in texts]
+    jobs = ((i, start, end) for i, t in enumerate(texts) if t for start, end in iter_windows(t))
+
+    windows = defaultdict(list)   # text index → [(start, end, entities)]
+    for group in batched(jobs, MAX_WINDOWS_PER_CALL):
+        results = _infer([texts[i][start:end] for i, start, end in group])
+        for (i, start, end), ents in zip(group, results):
+            windows[i].append((start, end, ents))
+
+    for i, parts in windows.items():
+        out[i] = merge_window_entities(parts)
+    return out
 
-# Load lightweight NER model (works on Streamlit Cloud)
-ner = pipeline("ner", model="dslim/bert-base-NER", aggregation_strategy="simple")
 
 def extract_entities(text: str):
     if not text:
         return []
-    result = ner(text)
-    return [{"text": ent["word"], "label": ent["entity_group"]} for ent in result]
+    return annotate_texts([text])[0]
 
 def extract_dates_from_text(text: str):
     if not text:
         return []
-    result = ner(text)
     dates = []
-    for ent in result:
-        if ent["entity_group"] in ("DATE", "TIME"):
-            d = parse_date(ent["word"])
+    for ent in annotate_texts([text])[0]:
+        if ent["label"] in ("DATE", "TIME"):
+            d = parse_natural_date(ent["text"])
             if d:
                 dates.append(d.date().isoformat())
     return sorted(list(set(dates)))
@@ -27,6 +87,4 @@ def extract_dates_from_text(text: str):
 def annotate_event_text(text):
     if not text:
         return []
-    result = ner(text)
-    return [{"text": ent["word"], "label": ent["entity_group"]} for ent in result]
-
+    return annotate_texts([text])[0]
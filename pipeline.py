@@ -0,0 +1,334 @@
+# pipeline.py — UI-free fetch → clean → NER → filter → LLM pipeline
+# Shared by app.py (Streamlit) and batch_run.py (headless).
+import contextvars
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from fetch_news import fetch_from_newsapi
+from fetch_gdelt import fetch_from_gdelt
+from fetch_google_news import fetch_google_news
+from fetch_wikipedia import fetch_wikipedia_page
+
+from dates import normalize_article_dates
+from extractive import local_timeline, summarize
+from preprocess import clean_html, smart_filter_articles
+from nlp import annotate_texts
+from story_index import STORY_CARD_TTL_S, get_story_index
+from tracing import span
+
+from llm_service import (
+    batch_timeline_and_summary,
+    batch_evaluate_link_authenticity,
+    batch_check_discrepancies,
+    llm_deadline,
+    DiscrepancyCheckIncomplete,
+    NO_SCORE_REASON
+)
+from llm_types import CredibilityResult
+
+# Latency-budget mode (used by app.py): after CARD_LATENCY_BUDGET seconds the
+# local extractive draft is shown; after LLM_DEADLINE seconds the draft is
+# final and no further Gemini calls or retries are started.
+CARD_LATENCY_BUDGET_S = float(os.getenv("CARD_LATENCY_BUDGET", "8"))
+LLM_DEADLINE_S = float(os.getenv("LLM_DEADLINE", "45"))
+
+
+def _noop(level, message):
+    pass
+
+
+# --------------------------------------
+# YEAR DETECTION
+# --------------------------------------
+def extract_year(query):
+    years = re.findall(r"\b(19\d{2}|20\d{2})\b", query)
+    return int(years[0]) if years else None
+
+
+# --------------------------------------
+# 1. FETCH
+# --------------------------------------
+def fetch_articles(query, notify=_noop):
+    """
+    Run the source fallback chain for a query.
+    Historical queries (<= 2021) go to Wikipedia; everything else tries
+    Google News → GDELT → NewsAPI. Wikipedia errors are raised to the caller.
+    """
+    with span("fetch", query=query) as s:
+        articles = _fetch_chain(query, notify)
+        s["items"] = len(articles)
+    return articles
+
+
+def _fetch_chain(query, notify):
+    year = extract_year(query)
+
+    if year and year <= 2021:
+        notify("info", "Using Wikipedia for historical events...")
+        return fetch_wikipedia_page(query)
+
+    notify("info", "Searching Google News…")
+    articles = fetch_google_news(query, max_results=15)
+
+    if not articles:
+        notify("warning", "Google News empty → trying GDELT…")
+        articles = fetch_from_gdelt(query, max_results=12)
+
+    if not articles:
+        notify("warning", "GDELT failed → trying NewsAPI…")
+        articles = fetch_from_newsapi(query, page_size=10)
+
+    return articles or []
+
+
+# --------------------------------------
+# 2. CLEAN + NER + FILTER
+# --------------------------------------
+def clean_articles(articles):
+    with span("clean", items=len(articles)) as s:
+        s["bytes_in"] = sum(len(a.get("content", "") or "") for a in articles)
+        for a in articles:
+            a["content"] = clean_html(a.get("content", "") or "")
+        normalize_article_dates(articles)
+        s["bytes"] = sum(len(a["content"]) for a in articles)
+    return articles
+
+
+def annotate_articles(articles):
+    with span("ner", items=len(articles)) as s:
+        s["bytes"] = sum(len(a["content"]) for a in articles)
+        for a, ents in zip(articles, annotate_texts(a["content"] for a in articles)):
+            a["entities"] = ents
+        s["entities"] = sum(len(a["entities"]) for a in articles)
+    return articles
+
+
+def filter_articles(query, articles):
+    with span("filter", items=len(articles)) as s:
+        kept = smart_filter_articles(query, articles)
+        s["kept"] = len(kept)
+    return kept
+
+
+def prepare_articles(query, articles):
+    clean_articles(articles)
+    annotate_articles(articles)
+    return filter_articles(query, articles)
+
+
+# --------------------------------------
+# 3. STORY INDEX (cross-query reuse)
+# --------------------------------------
+def lookup_story_card(query, max_age=STORY_CARD_TTL_S):
+    """
+    A fresh card for the story this query names (see StoryIndex.resolve),
+    or None. Related queries are not served here: they fetch, and
+    index_articles() links them to the story. Disabled with STORY_INDEX=0.
+    """
+    index = get_story_index()
+    if index is None:
+        return None
+    with span("story.lookup", query=query) as s:
+        card = index.card_for_query(query, max_age)
+        s["hit"] = card is not None
+    return card
+
+
+def index_articles(query, articles):
+    """Assign the filtered articles to a story; returns its id (None when disabled)."""
+    index = get_story_index()
+    if index is None:
+        return None
+    with span("story.assign", items=len(articles)) as s:
+        story_id, new_urls = index.assign(query, articles)
+        s["story_id"] = story_id
+        s["new"] = len(new_urls)
+    return story_id
+
+
+def _score_credibility(articles, index):
+    """
+    Credibility results, reusing stored scores and sending only unseen URLs to
+    Gemini. Returns (results, complete); complete is False when Gemini scored
+    none of the unseen URLs (e.g. an unparseable reply).
+    """
+    known = index.load_credibility(a.get("url", "") for a in articles) if index else {}
+    unseen = [a for a in articles if a.get("url", "") not in known]
+    results = CredibilityResult.list_from(list(known.values()))
+    if not unseen:
+        return results, True
+    fresh = batch_evaluate_link_authenticity(unseen)
+    scored = [r for r in fresh if r.reasoning != NO_SCORE_REASON]
+    if index:
+        index.save_credibility(r.to_dict() for r in scored)
+    return results + fresh, bool(scored)
+
+
+# --------------------------------------
+# 4. LLM ANALYSIS → SUMMARY CARD
+# --------------------------------------
+def _sources(articles, scores):
+    return [
+        {
+            "title": a.get("title", ""),
+            "source": a.get("source", ""),
+            "publishedAt": a.get("publishedAt", ""),
+            "url": a.get("url", ""),
+            "credibility_score": scores[i],
+        }
+        for i, a in enumerate(articles)
+    ]
+
+
+def build_local_card(query, articles):
+    """
+    Summary card from local methods only (extractive.py): milestone timeline,
+    TextRank summary, neutral credibility and no discrepancy check.
+    Marked with "draft": True.
+    """
+    articles_llm = articles[:20]
+    with span("local_card", items=len(articles_llm)):
+        return {
+            "query": query,
+            "timeline": local_timeline(articles_llm),
+            "summary": summarize(articles_llm) or "Summary unavailable.",
+            "discrepancies": [],
+            "sources": _sources(articles_llm, [0.6] * len(articles_llm)),
+            "overall_score": 0.6,
+            "draft": True,
+        }
+
+
+def build_summary_card(query, articles, notify=_noop, budget_s=None, deadline_s=None, on_draft=None,
+                       story_id=None):
+    """
+    Run the three batched Gemini stages and return a plain-dict summary card.
+    Stage failures degrade to empty results (reported through notify) so a
+    single bad call never loses the whole card. A card with a failed stage,
+    or one that returned only placeholders, is marked "degraded": True and
+    is not cached.
+
+    With a story_id (see index_articles) the story's stored analysis is
+    reused where it still applies, and the finished card is saved to it.
+
+    With budget_s/deadline_s the LLM stages run in a worker thread while the
+    local draft (build_local_card) is built alongside. If the LLM card is not
+    ready after budget_s seconds, on_draft(draft) is called; if it is still
+    not ready after deadline_s, the draft is returned instead.
+    """
+    if budget_s is None and deadline_s is None:
+        with span("llm", items=min(len(articles), 20)):
+            return _build_summary_card(query, articles, notify, story_id)
+    return _build_hedged_card(query, articles, notify, budget_s, deadline_s, on_draft, story_id)
+
+
+def _build_hedged_card(query, articles, notify, budget_s, deadline_s, on_draft, story_id=None):
+    start = time.monotonic()
+    abandoned = threading.Event()
+
+    def llm_notify(level, message):
+        # once the draft is final, late stage failures are nobody's business
+        if not abandoned.is_set():
+            notify(level, message)
+
+    def llm_card():
+        with llm_deadline(deadline_s), span("llm", items=min(len(articles), 20)):
+            return _build_summary_card(query, articles, llm_notify, story_id)
+
+    pool = ThreadPoolExecutor(max_workers=1)
+    try:
+        future = pool.submit(contextvars.copy_context().run, llm_card)
+        draft = build_local_card(query, articles)
+
+        with span("hedge", budget_s=budget_s, deadline_s=deadline_s) as s:
+            if budget_s is not None:
+                try:
+                    card = future.result(timeout=max(0.0, budget_s - (time.monotonic() - start)))
+                    s["outcome"] = "llm"
+                    return card
+                except FutureTimeout:
+                    s["draft_shown_ms"] = round((time.monotonic() - start) * 1000, 3)
+                    if on_draft:
+                        on_draft(draft)
+
+            remaining = None if deadline_s is None else max(0.0, deadline_s - (time.monotonic() - start))
+            try:
+                card = future.result(timeout=remaining)
+                s["outcome"] = "llm_late" if budget_s is not None else "llm"
+                return card
+            except FutureTimeout:
+                s["outcome"] = "draft"
+                abandoned.set()
+                notify("warning", f"AI analysis did not finish within {deadline_s:.0f}s — showing the local summary.")
+                return draft
+    finally:
+        pool.shutdown(wait=False)
+
+
+def _build_summary_card(query, articles, notify, story_id=None):
+    articles_llm = articles[:20]
+    index = get_story_index() if story_id is not None else None
+    failed = False
+
+    # same story, no new articles since its card was built → same timeline
+    reused = index.reusable_analysis(story_id, [a.get("url", "") for a in articles_llm]) if index else None
+    if reused:
+        notify("info", "♻️ Reusing the story's timeline + summary...")
+        timeline, summary = reused
+    else:
+        notify("info", "⏳ Building timeline + summary...")
+        try:
+            result = batch_timeline_and_summary(articles_llm, query=query)
+            timeline = [t.to_dict() for t in result.timeline]
+            summary = result.summary
+        except Exception as e:
+            notify("error", f"Timeline/summary generation failed: {e}")
+            timeline, summary = [], "Summary unavailable."
+            failed = True
+
+    notify("info", "⏳ Evaluating credibility...")
+    try:
+        auth_results, complete = _score_credibility(articles_llm, index)
+        if not complete:
+            notify("warning", "Credibility scoring returned no scores; using neutral scores.")
+            failed = True
+    except Exception as e:
+        notify("warning", f"Credibility scoring failed: {e}")
+        auth_results = []
+        failed = True
+
+    auth_map = {r.url: r.credibility_score for r in auth_results}
+    per_link_scores = [auth_map.get(a.get("url", ""), 0.6) for a in articles_llm]
+    overall_score = sum(per_link_scores)/len(per_link_scores) if per_link_scores else 0.6
+
+    notify("info", "⏳ Checking inconsistencies across sources...")
+    try:
+        discrepancies = [d.to_dict() for d in batch_check_discrepancies(timeline, articles_llm, store=index)]
+    except DiscrepancyCheckIncomplete as e:
+        # partial verdicts are still shown, but the card must not be cached
+        notify("warning", f"Discrepancy analysis incomplete: {e}")
+        discrepancies = [d.to_dict() for d in e.results]
+        failed = True
+    except Exception as e:
+        notify("warning", f"Discrepancy analysis failed: {e}")
+        discrepancies = []
+        failed = True
+
+    card = {
+        "query": query,
+        "timeline": timeline,
+        "summary": summary,
+        "discrepancies": discrepancies,
+        "sources": _sources(articles_llm, per_link_scores),
+        "overall_score": overall_score,
+    }
+    # a stage failed or returned only placeholders (often a transient 429):
+    # show the card, but never cache it
+    if failed:
+        card["degraded"] = True
+    elif index:
+        index.save_card(story_id, card)
+    return card
@@ -1,7 +1,8 @@
 # preprocess.py
 import re
 from bs4 import BeautifulSoup
-from datetime import datetime
+
+from dates import normalize_day
 
 # ---------------------------------------------------
 # 1. Clean HTML Content
@@ -78,8 +79,5 @@ def smart_filter_articles(query, articles):
 # 4. GDELT Date Parser
 # ---------------------------------------------------
 def parse_gdelt_date(dt):
-    try:
-        return datetime.strptime(dt, "%Y%m%d%H%M%S").strftime("%Y-%m-%d")
-    except:
-        return dt
+    return normalize_day(dt) or dt
 
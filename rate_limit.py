@@ -0,0 +1,82 @@
+# rate_limit.py — shared, thread-safe request pacing for external APIs
+import os
+import threading
+import time
+
+# Requests per minute for each upstream. Override with e.g. GDELT_RPM=30.
+# Gemini quotas are per model (see model_router.py, e.g. GEMINI_2_0_FLASH_RPM);
+# "gemini" is an optional overall cap across all models (0 = none).
+DEFAULT_RPM = {
+    "gemini": 0,
+    "gdelt": 12,
+    "newsapi": 60,
+    "google_news": 60,
+    "wikipedia": 120,
+}
+
+
+class RateLimiter:
+    """
+    Minimum-interval limiter: callers block in acquire() until the next
+    slot opens. One instance is shared by every thread in the process.
+    """
+
+    def __init__(self, rpm):
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+        self.set_rpm(rpm)
+
+    def set_rpm(self, rpm):
+        rpm = float(rpm or 0)
+        self.interval = 60.0 / rpm if rpm > 0 else 0.0
+
+    def expected_wait(self):
+        """Seconds a caller arriving now would wait (how far the queue is booked)."""
+        return max(0.0, self._next_slot - time.monotonic()) if self.interval else 0.0
+
+    def acquire(self):
+        """Block until a slot is free. Returns the seconds spent waiting."""
+        if not self.interval:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+        return max(0.0, slot - now)
+
+
+_limiters = {}
+_base_rpm = {}
+_share = 1.0
+_registry_lock = threading.Lock()
+
+
+def get_limiter(name, default_rpm=0):
+    """
+    Return the process-wide limiter for an upstream, creating it on first use.
+    Budget: {NAME}_RPM env var, else DEFAULT_RPM, else default_rpm.
+    """
+    with _registry_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            rpm = float(os.getenv(f"{name.upper()}_RPM", DEFAULT_RPM.get(name, default_rpm)))
+            _base_rpm[name] = rpm
+            limiter = RateLimiter(rpm * _share)
+            _limiters[name] = limiter
+        return limiter
+
+
+def configure_rate_limits(share=1.0, **overrides):
+    """
+    Rescale every limiter (including ones created later) to a fraction of
+    its budget. Used by worker processes so N processes together stay
+    within the quota. share=0 disables pacing (benchmarks).
+    """
+    global _share
+    _share = share
+    for name in set(DEFAULT_RPM) | set(overrides) | set(_limiters):
+        limiter = get_limiter(name)
+        rpm = overrides.get(name) or _base_rpm[name]
+        limiter.set_rpm(float(rpm) * share)
@@ -0,0 +1,29 @@
+# storage.py — tiny JSON file cache for fetched article batches
+import json
+import os
+import re
+
+STORAGE_DIR = os.getenv("ARTICLE_CACHE_DIR", os.path.join("data", "articles"))
+
+
+def _path_for(query):
+    slug = re.sub(r"[^a-z0-9]+", "-", query.lower()).strip("-") or "query"
+    return os.path.join(STORAGE_DIR, f"{slug}.json")
+
+
+def load_articles(query):
+    """Return the cached article list for a query, or None if not cached."""
+    path = _path_for(query)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_articles(query, articles):
+    os.makedirs(STORAGE_DIR, exist_ok=True)
+    with open(_path_for(query), "w", encoding="utf-8") as f:
+        json.dump(articles, f, ensure_ascii=False, indent=2)
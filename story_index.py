@@ -0,0 +1,307 @@
+# story_index.py — persistent cross-query story index (sqlite)
+#
+# "Chandrayaan-3", "Chandrayaan-3 landing" and "ISRO moon mission 2023" are
+# the same story. Each analysed batch of articles is clustered into a story
+# by entity overlap and term-vector similarity, and the story keeps its card
+# (timeline, summary, sources), per-URL credibility results and per-event
+# discrepancy verdicts. Only a query already seen for a story (or one naming
+# it outright) is served before fetching; any other query fetches, and if its
+# articles join a known story only the new material is sent to the LLM.
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import lru_cache
+
+from evidence_index import STOPWORDS, tokenize
+
+STORY_DB = os.getenv("STORY_INDEX_DB", os.path.join("data", "stories.sqlite3"))
+STORY_INDEX_ENABLED = os.getenv("STORY_INDEX", "1") != "0"
+STORY_CARD_TTL_S = float(os.getenv("STORY_CARD_TTL", str(6 * 3600)))
+MATCH_THRESHOLD = float(os.getenv("STORY_MATCH_THRESHOLD", "0.35"))
+TOP_TERMS = 60
+TOP_ENTITIES = 30
+ENTITY_LABELS = ("ORG", "PER", "LOC", "MISC")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stories (
+    id INTEGER PRIMARY KEY, label TEXT, profile TEXT,
+    card TEXT, card_at REAL, created_at REAL, updated_at REAL
+);
+CREATE TABLE IF NOT EXISTS story_articles (
+    url TEXT PRIMARY KEY, story_id INTEGER, title TEXT, source TEXT,
+    published_at TEXT, added_at REAL
+);
+CREATE INDEX IF NOT EXISTS story_articles_story ON story_articles(story_id);
+CREATE TABLE IF NOT EXISTS queries (query TEXT PRIMARY KEY, story_id INTEGER, resolved_at REAL);
+CREATE TABLE IF NOT EXISTS credibility (url TEXT PRIMARY KEY, result TEXT, updated_at REAL);
+CREATE TABLE IF NOT EXISTS verdicts (key TEXT PRIMARY KEY, result TEXT, updated_at REAL);
+"""
+
+
+# ---------------------------------------------------
+# Story profiles and similarity
+# ---------------------------------------------------
+_QUERY_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def query_terms(query):
+    """Query tokens; unlike tokenize(), single digits are kept ("Chandrayaan-3" ≠ "Chandrayaan-2")."""
+    return [t for t in _QUERY_TOKEN.findall(query.lower())
+            if t not in STOPWORDS and (len(t) > 1 or t.isdigit())]
+
+
+def _normalize_query(query):
+    return " ".join(query_terms(query))
+
+
+def _numbers_conflict(query, label):
+    """True when both name numbers and they differ ("Chandrayaan-2" vs "Chandrayaan-3")."""
+    q = {t for t in query_terms(query) if t.isdigit()}
+    l = {t for t in query_terms(label or "") if t.isdigit()}
+    return bool(q and l and q != l)
+
+
+def profile_of(articles):
+    """
+    {"entities": {name: n_articles}, "terms": {term: n_articles}} for a batch,
+    keeping the most widespread entities and terms.
+    """
+    entities, terms = Counter(), Counter()
+    for a in articles:
+        entities.update({
+            e["text"].lower() for e in a.get("entities") or []
+            if e.get("label") in ENTITY_LABELS and len(e["text"]) > 2 and not e["text"].startswith("##")
+        })
+        terms.update(set(tokenize(f"{a.get('title', '')} {(a.get('content') or '')[:2000]}")))
+    return {
+        "entities": dict(entities.most_common(TOP_ENTITIES)),
+        "terms": dict(terms.most_common(TOP_TERMS)),
+    }
+
+
+def merge_profiles(a, b):
+    merged = {}
+    for key, top in (("entities", TOP_ENTITIES), ("terms", TOP_TERMS)):
+        counts = Counter(a.get(key, {}))
+        counts.update(b.get(key, {}))
+        merged[key] = dict(counts.most_common(top))
+    return merged
+
+
+def _weighted_jaccard(a, b):
+    if not a or not b:
+        return None
+    na, nb = max(a.values()), max(b.values())
+    keys = set(a) | set(b)
+    num = sum(min(a.get(k, 0) / na, b.get(k, 0) / nb) for k in keys)
+    den = sum(max(a.get(k, 0) / na, b.get(k, 0) / nb) for k in keys)
+    return num / den if den else 0.0
+
+
+def _cosine(a, b):
+    if not a or not b:
+        return 0.0
+    dot = sum(x * b.get(k, 0) for k, x in a.items())
+    norm = math.sqrt(sum(x * x for x in a.values())) * math.sqrt(sum(x * x for x in b.values()))
+    return dot / norm if norm else 0.0
+
+
+def similarity(a, b):
+    """Mean of entity overlap and term cosine (term cosine alone if either lacks entities)."""
+    terms = _cosine(a.get("terms", {}), b.get("terms", {}))
+    entities = _weighted_jaccard(a.get("entities", {}), b.get("entities", {}))
+    return terms if entities is None else (terms + entities) / 2
+
+
+def verdict_key(event):
+    """Content hash of one event and its evidence passages (see llm_service.build_event_evidence)."""
+    raw = json.dumps([event.get("date", ""), event.get("event", ""),
+                      sorted(p["text"] for p in event.get("evidence", []))], ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------
+# Index
+# ---------------------------------------------------
+class StoryIndex:
+    """
+    One sqlite file shared by app sessions, batch workers and processes.
+    Every method opens its own short-lived connection, so it is safe to
+    call from any thread.
+    """
+
+    def __init__(self, path=STORY_DB):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._db() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(_SCHEMA)
+
+    @contextmanager
+    def _db(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # ---- stories --------------------------------------------------
+    def _stories(self, db):
+        return [(row["id"], row["label"], json.loads(row["profile"] or "{}"))
+                for row in db.execute("SELECT id, label, profile FROM stories")]
+
+    def resolve(self, query):
+        """
+        Story id a query names: a query assigned to it before, or one whose
+        terms include every term of the story's label and otherwise only
+        its label and entity terms ("ISRO Chandrayaan-3" for "Chandrayaan-3").
+        Related but broader queries ("India", "August 2023") resolve to
+        nothing; they fetch and are clustered by assign().
+        """
+        norm = _normalize_query(query)
+        q_terms = set(norm.split())
+        if not q_terms:
+            return None
+        with self._db() as db:
+            row = db.execute("SELECT story_id FROM queries WHERE query = ?", (norm,)).fetchone()
+            if row:
+                return row["story_id"]
+            for sid, label, profile in self._stories(db):
+                label_terms = set(query_terms(label or ""))
+                anchors = set(label_terms)
+                for name in profile.get("entities", {}):
+                    anchors.update(query_terms(name))
+                if label_terms and label_terms <= q_terms <= anchors:
+                    return sid
+        return None
+
+    def assign(self, query, articles):
+        """
+        Cluster an article batch into a story (existing or new) and remember
+        the query. Returns (story_id, new_urls) — the URLs not seen before.
+        """
+        profile = profile_of(articles)
+        urls = [a.get("url", "") for a in articles if a.get("url")]
+        now = time.time()
+        with self._db() as db:
+            known = {}
+            for i in range(0, len(urls), 500):
+                chunk = urls[i:i + 500]
+                known.update(db.execute(
+                    f"SELECT url, story_id FROM story_articles WHERE url IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall())
+
+            # 1) articles already indexed vote for their story
+            story_id = Counter(known.values()).most_common(1)[0][0] if known else None
+            stories = {sid: (label, p) for sid, label, p in self._stories(db)}
+            # 2) otherwise the most similar story, if similar enough and not
+            #    a differently numbered sibling (mission 2 vs mission 3)
+            candidates = [(sid, similarity(profile, p)) for sid, (label, p) in stories.items()
+                          if not _numbers_conflict(query, label)]
+            if story_id is None and candidates:
+                sid, score = max(candidates, key=lambda kv: kv[1])
+                if score >= MATCH_THRESHOLD:
+                    story_id = sid
+
+            if story_id is None:
+                story_id = db.execute(
+                    "INSERT INTO stories (label, profile, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                    (query, json.dumps(profile), now, now)
+                ).lastrowid
+            else:
+                new_profile = merge_profiles(stories[story_id][1], profile) if story_id in stories else profile
+                db.execute("UPDATE stories SET profile = ?, updated_at = ? WHERE id = ?",
+                           (json.dumps(new_profile), now, story_id))
+
+            new_urls = [u for u in urls if u not in known]
+            by_url = {a.get("url"): a for a in articles}
+            db.executemany(
+                "INSERT OR IGNORE INTO story_articles VALUES (?, ?, ?, ?, ?, ?)",
+                [(u, story_id, by_url[u].get("title", ""), by_url[u].get("source", ""),
+                  by_url[u].get("publishedAt", ""), now) for u in new_urls]
+            )
+            db.execute("INSERT OR REPLACE INTO queries VALUES (?, ?, ?)",
+                       (_normalize_query(query), story_id, now))
+        return story_id, new_urls
+
+    # ---- cards ----------------------------------------------------
+    def save_card(self, story_id, card):
+        with self._db() as db:
+            db.execute("UPDATE stories SET card = ?, card_at = ? WHERE id = ?",
+                       (json.dumps(card, ensure_ascii=False), time.time(), story_id))
+
+    def card(self, story_id, max_age=None):
+        """Stored card for a story, or None (also when older than max_age seconds)."""
+        with self._db() as db:
+            row = db.execute("SELECT card, card_at FROM stories WHERE id = ?", (story_id,)).fetchone()
+        if not row or not row["card"]:
+            return None
+        if max_age is not None and time.time() - row["card_at"] > max_age:
+            return None
+        return json.loads(row["card"])
+
+    def card_for_query(self, query, max_age=STORY_CARD_TTL_S):
+        """A fresh card for the story this query resolves to, relabelled with the query."""
+        story_id = self.resolve(query)
+        card = self.card(story_id, max_age) if story_id is not None else None
+        if card is not None:
+            card["query"] = query
+        return card
+
+    def reusable_analysis(self, story_id, urls):
+        """(timeline, summary) from the stored card if it already covered all these URLs."""
+        card = self.card(story_id)
+        if not card:
+            return None
+        covered = {s.get("url") for s in card.get("sources", [])}
+        if not set(urls) <= covered:
+            return None
+        return card.get("timeline", []), card.get("summary", "")
+
+    # ---- per-URL credibility and per-event verdicts ---------------
+    def _load(self, table, column, keys):
+        keys = list(keys)
+        out = {}
+        with self._db() as db:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                for row in db.execute(
+                    f"SELECT {column}, result FROM {table} WHERE {column} IN ({','.join('?' * len(chunk))})", chunk
+                ):
+                    out[row[column]] = json.loads(row["result"])
+        return out
+
+    def _save(self, table, items):
+        now = time.time()
+        with self._db() as db:
+            db.executemany(f"INSERT OR REPLACE INTO {table} VALUES (?, ?, ?)",
+                           [(k, json.dumps(v, ensure_ascii=False), now) for k, v in items.items()])
+
+    def load_credibility(self, urls):
+        """{url: CredibilityResult dict} for URLs scored before."""
+        return self._load("credibility", "url", urls)
+
+    def save_credibility(self, results):
+        self._save("credibility", {r["url"]: r for r in results if r.get("url")})
+
+    def load_verdicts(self, keys):
+        """{verdict_key: DiscrepancyResult dict} for events checked before on the same evidence."""
+        return self._load("verdicts", "key", keys)
+
+    def save_verdicts(self, items):
+        self._save("verdicts", items)
+
+
+@lru_cache(maxsize=1)
+def get_story_index():
+    """The process-wide index, or None when STORY_INDEX=0."""
+    return StoryIndex() if STORY_INDEX_ENABLED else None
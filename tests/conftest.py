@@ -0,0 +1,42 @@
+# Shared test setup: offline stand-in model, no quota pacing, throwaway caches.
+import os
+import sys
+import tempfile
+
+# must be set before local_llm / llm_service / http_client are imported
+os.environ["GEMINI_STANDIN"] = "1"
+os.environ.setdefault("HTTP_CACHE_DIR", tempfile.mkdtemp(prefix="test-http-"))
+os.environ.setdefault("STORY_INDEX", "0")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+@pytest.fixture
+def stand_in():
+    """llm_service wired to local_llm.StandInModel, with rate limiting off."""
+    import llm_service
+    from local_llm import StandInModel
+    from rate_limit import configure_rate_limits
+
+    llm_service.set_model_factory(StandInModel)
+    configure_rate_limits(share=0)
+    yield llm_service
+    configure_rate_limits(share=1)
+    llm_service.set_model_factory(None)
+
+
+@pytest.fixture
+def fixture_server(tmp_path):
+    """Fetchers pointed at the local fixture server, with a fresh HTTP cache."""
+    from benchmarks.stand_in import serve_fixtures
+    from http_client import set_http_cache
+    from rate_limit import configure_rate_limits
+
+    configure_rate_limits(share=0)
+    set_http_cache(str(tmp_path / "http"))
+    with serve_fixtures() as base:
+        yield base
+    set_http_cache("")
+    configure_rate_limits(share=1)
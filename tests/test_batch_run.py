@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+import batch_run
+
+
+@pytest.fixture
+def offline(fixture_server, stand_in, monkeypatch):
+    """Fixture feeds, the stand-in model and a fake NER model (transformers is optional)."""
+    import nlp
+    monkeypatch.setattr(nlp, "load_local_ner", lambda: lambda batch, **k: [[] for _ in batch])
+
+
+def test_read_topics_skips_blanks_and_comments(tmp_path):
+    path = tmp_path / "topics.txt"
+    path.write_text("# launches\nChandrayaan-3\n\n  Artemis II  \n   # not this\n", encoding="utf-8")
+    assert batch_run.read_topics(str(path)) == ["Chandrayaan-3", "Artemis II"]
+
+
+def test_run_topic_builds_a_card(offline):
+    card = batch_run.run_topic("Chandrayaan-3")
+    assert card["timeline"] and card["sources"] and not card.get("degraded")
+
+
+def test_failures_become_error_cards(offline, monkeypatch):
+    import pipeline
+
+    def boom(query):
+        raise RuntimeError("feeds down")
+
+    monkeypatch.setattr(pipeline, "fetch_articles", boom)
+    card, stats = batch_run._safe_run_topic("Chandrayaan-3")
+    assert card["error"] == "RuntimeError: feeds down"
+
+
+def test_main_writes_one_card_per_topic(offline, tmp_path, capsys):
+    topics = tmp_path / "topics.txt"
+    topics.write_text("Chandrayaan-3\nVikram lander\n", encoding="utf-8")
+    out = tmp_path / "cards.jsonl"
+
+    assert batch_run.main([str(topics), "--out", str(out), "--workers", "2"]) == 0
+    cards = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert sorted(c["query"] for c in cards) == ["Chandrayaan-3", "Vikram lander"]
+    assert all("fetch" in c["stage_seconds"] and "llm" in c["stage_seconds"] for c in cards)
+    assert capsys.readouterr().err.count("[ok]") == 2
+
+
+def test_main_without_topics(tmp_path):
+    empty = tmp_path / "topics.txt"
+    empty.write_text("# nothing yet\n", encoding="utf-8")
+    assert batch_run.main([str(empty), "--out", str(tmp_path / "cards.jsonl")]) == 1
@@ -0,0 +1,43 @@
+import pytest
+
+from chunking import batched, iter_sentences, iter_windows, merge_window_entities
+
+
+def test_iter_windows_overlap():
+    text = " ".join(f"w{i}" for i in range(10))
+    windows = [text[s:e].split() for s, e in iter_windows(text, window=4, overlap=1)]
+    assert windows == [["w0", "w1", "w2", "w3"], ["w3", "w4", "w5", "w6"], ["w6", "w7", "w8", "w9"]]
+    with pytest.raises(ValueError):
+        list(iter_windows(text, window=4, overlap=4))
+
+
+def test_iter_sentences_bounds_long_runs():
+    assert list(iter_sentences("One. Two!  Three?")) == ["One.", "Two!", "Three?"]
+    assert all(len(s.split()) <= 5 for s in iter_sentences(" ".join(["word"] * 40), max_words=5))
+
+
+def test_batched():
+    assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+def test_merge_keeps_entity_in_overlap_once():
+    text = "ISRO said Vikram landed near the south pole of the Moon today"
+    windows = list(iter_windows(text, window=6, overlap=3))
+    parts = []
+    for start, end in windows:
+        chunk = text[start:end]
+        ents = []
+        for word, label in (("ISRO", "ORG"), ("Vikram", "MISC"), ("Moon", "LOC")):
+            i = chunk.find(word)
+            if i >= 0:
+                ents.append({"text": word, "label": label, "start": i, "end": i + len(word)})
+        parts.append((start, end, ents))
+    assert [e["text"] for e in merge_window_entities(parts)] == ["ISRO", "Vikram", "Moon"]
+
+
+def test_merge_without_offsets_drops_repeats_from_previous_window():
+    parts = [
+        (0, 10, [{"text": "ISRO", "label": "ORG"}]),
+        (5, 15, [{"text": "ISRO", "label": "ORG"}, {"text": "Moon", "label": "LOC"}]),
+    ]
+    assert merge_window_entities(parts) == [{"text": "ISRO", "label": "ORG"}, {"text": "Moon", "label": "LOC"}]
@@ -0,0 +1,70 @@
+from claims import align_claims, extract_claims, prefilter_event
+
+
+def _event(*passages):
+    return {"evidence": [{"source": s, "text": t, "score": 1.0} for s, t in passages]}
+
+
+def test_extract_claims_units_and_dates():
+    claims = extract_claims("Landed on 23 August 2023 at 18:04, about 600 km from the pole.", "A")
+    by_unit = {c.unit: c for c in claims}
+    assert by_unit["date"].date == "2023-08-23"
+    assert by_unit["time"].quantity == 18 * 60 + 4
+    assert by_unit["km"].quantity == 600 and by_unit["km"].approx
+
+
+def test_align_claims_agreement_and_conflict():
+    agree = extract_claims("The landing was on 23 August 2023.", "A") + \
+        extract_claims("It touched down on August 23, 2023.", "B")
+    agreements, conflicts = align_claims(agree)
+    assert agreements and not conflicts
+
+    clash = extract_claims("At least 40 dead after the quake.", "A") + \
+        extract_claims("The quake left 75 dead.", "B")
+    agreements, conflicts = align_claims(clash)
+    assert conflicts and not agreements
+
+
+def test_prefilter_resolves_only_agreeing_figures_across_sources():
+    verdict = prefilter_event(_event(
+        ("A", "Landed on 23 August 2023, about 600 km from the south pole."),
+        ("B", "It touched down on August 23, 2023, some 600 km from the pole."),
+    ))
+    assert verdict["is_consistent"] and verdict["severity"] == "low"
+
+
+def test_shared_dates_alone_do_not_make_an_event_consistent():
+    assert prefilter_event(_event(
+        ("A", "The Vikram lander crashed into the lunar surface on 23 August 2023."),
+        ("B", "The Vikram lander touched down safely on the Moon on 23 August 2023."),
+    )) is None
+    assert prefilter_event(_event(
+        ("A", "Landed on 23 August 2023 at 18:04."),
+        ("B", "It touched down on August 23, 2023 at 6:04 pm."),
+    )) is None
+
+
+def test_prefilter_sends_prose_contradictions_to_the_llm():
+    assert prefilter_event(_event(
+        ("A", "The lander crashed on the surface."),
+        ("B", "The lander touched down safely."),
+    )) is None
+
+
+def test_prefilter_needs_two_sources():
+    assert prefilter_event(_event(("A", "Landed on 23 August 2023."))) is None
+
+
+def test_prefilter_needs_every_source_compared():
+    assert prefilter_event(_event(
+        ("A", "Landed on 23 August 2023."),
+        ("B", "It touched down on August 23."),
+        ("C", "The lander crashed."),
+    )) is None
+
+
+def test_prefilter_leaves_conflicts_to_the_llm():
+    assert prefilter_event(_event(
+        ("A", "Landed on 23 August 2023."),
+        ("B", "It touched down on August 24, 2023."),
+    )) is None
@@ -0,0 +1,35 @@
+from dates import detect_format, normalize_article_dates, normalize_date, normalize_day
+
+
+def test_detect_format():
+    assert detect_format("20230823T124500Z") == "gdelt"
+    assert detect_format("2023-08-23T12:45:00Z") == "iso"
+    assert detect_format("Wed, 23 Aug 2023 12:45:00 GMT") == "rfc822"
+    assert detect_format("last Tuesday") == "text"
+
+
+def test_normalize_date_to_utc():
+    assert normalize_date("20230823T124500Z") == "2023-08-23T12:45:00Z"
+    assert normalize_date("2023-08-23T18:15:00+05:30") == "2023-08-23T12:45:00Z"
+    assert normalize_date("Wed, 23 Aug 2023 12:45:00 GMT") == "2023-08-23T12:45:00Z"
+    assert normalize_date("") == ""
+
+
+def test_wrong_declared_format_falls_back_to_detection():
+    assert normalize_date("2023-08-23T12:45:00Z", fmt="rfc822") == "2023-08-23T12:45:00Z"
+
+
+def test_normalize_day():
+    assert normalize_day("Wed, 23 Aug 2023 23:30:00 -0400") == "2023-08-24"
+
+
+def test_normalize_article_dates_mixed_batch():
+    articles = [{"publishedAt": "20230823T124500Z"}, {"publishedAt": "2023-08-24T00:00:00Z"}]
+    normalize_article_dates(articles)
+    assert [a["publishedAt"] for a in articles] == ["2023-08-23T12:45:00Z", "2023-08-24T00:00:00Z"]
+
+
+def test_free_text_first_value_does_not_lock_the_batch():
+    articles = [{"publishedAt": "last Tuesday"}, {"publishedAt": "20230823124500"}]
+    normalize_article_dates(articles)
+    assert articles[1]["publishedAt"] == "2023-08-23T12:45:00Z"
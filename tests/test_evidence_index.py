@@ -0,0 +1,44 @@
+from evidence_index import EvidenceIndex, tokenize
+
+ARTICLES = [
+    {"source": "A", "url": "https://a.example/1", "publishedAt": "2023-08-23T12:45:00Z",
+     "content": "The Vikram lander touched down near the lunar south pole. "
+                "ISRO engineers cheered in the control room. "
+                "The Pragyan rover will explore the surface for one lunar day."},
+    {"source": "B", "url": "https://b.example/1", "publishedAt": "2023-08-23T13:00:00Z",
+     "content": "Vikram landed near the south pole of the Moon on Wednesday. "
+                "The Vikram lander touched down near the lunar south pole. "
+                "Short one."},
+    {"source": "C", "url": "https://c.example/1", "publishedAt": "2023-08-24T00:00:00Z",
+     "content": "Markets rallied as space stocks climbed after the news."},
+]
+
+
+def test_tokenize_drops_stopwords_and_single_letters():
+    assert tokenize("The lander is on a Moon at 6 pm") == ["lander", "moon", "pm"]
+
+
+def test_passages_are_sentences_deduplicated_per_source():
+    index = EvidenceIndex(ARTICLES + [ARTICLES[0]])
+    texts = [(p["source"], p["text"]) for p in index.passages]
+    assert len(texts) == len(set(texts)) == len(index) == 6
+    assert ("B", "Short one.") not in texts
+    assert index.passages[0]["url"] == "https://a.example/1"
+
+
+def test_search_ranks_passages_mentioning_the_event():
+    hits = EvidenceIndex(ARTICLES).search("Vikram lander touched down near the south pole", k=3)
+    assert hits[0]["text"].startswith("The Vikram lander touched down")
+    assert {h["source"] for h in hits} == {"A", "B"}
+    assert all(h["score"] > 0 for h in hits)
+    assert [h["score"] for h in hits] == sorted((h["score"] for h in hits), reverse=True)
+
+
+def test_search_caps_passages_per_source():
+    hits = EvidenceIndex(ARTICLES).search("Vikram lander lunar south pole rover", k=6, max_per_source=1)
+    assert sorted(h["source"] for h in hits) == ["A", "B"]
+
+
+def test_unmatched_and_empty_queries():
+    assert EvidenceIndex(ARTICLES).search("volcano eruption") == []
+    assert EvidenceIndex([]).search("Vikram") == []
@@ -0,0 +1,77 @@
+import time
+
+from extractive import local_timeline, summarize
+from local_llm import StandInModel
+
+ARTICLES = [
+    {"url": "https://a.example/1", "source": "A", "publishedAt": "2023-08-23T12:45:00Z",
+     "title": "Vikram lands",
+     "content": "The Vikram lander touched down near the lunar south pole on Wednesday evening. "
+                "ISRO confirmed the landing minutes later from its control centre in Bengaluru. "
+                "India became the first country to land near the south pole of the Moon."},
+    {"url": "https://b.example/1", "source": "B", "publishedAt": "2023-08-24T08:00:00Z",
+     "title": "Pragyan rolls out",
+     "content": "The Pragyan rover rolled down the ramp a day after the lander reached the surface. "
+                "The Vikram lander touched down near the lunar south pole on Wednesday evening. "
+                "Scientists will study the lunar soil for one lunar day of about fourteen days."},
+]
+
+
+def test_summarize_picks_central_sentences_without_repeats():
+    summary = summarize(ARTICLES, max_sentences=3)
+    assert summary.count("The Vikram lander touched down") == 1
+    assert len([s for s in summary.split(". ") if s]) <= 3
+    assert summarize([]) == ""
+
+
+def test_local_timeline_from_trigger_sentences():
+    timeline = local_timeline(ARTICLES)
+    assert [e["date"] for e in timeline] == ["2023-08-23", "2023-08-24"]
+    assert all(e["event"] for e in timeline)
+    assert local_timeline(ARTICLES, max_chars=30)[0]["event"].endswith("…")
+
+
+def test_local_timeline_falls_back_to_titles():
+    quiet = [{**a, "content": "Nothing much happened here today at all."} for a in ARTICLES]
+    assert local_timeline(quiet) == [
+        {"date": "2023-08-23", "event": "Vikram lands"},
+        {"date": "2023-08-24", "event": "Pragyan rolls out"},
+    ]
+
+
+class SlowModel(StandInModel):
+    def generate_content(self, prompt, **kwargs):
+        time.sleep(0.3)
+        return super().generate_content(prompt, **kwargs)
+
+
+def test_hedged_card_shows_the_draft_then_the_llm_card(stand_in):
+    import pipeline
+
+    stand_in.set_model_factory(SlowModel)
+    drafts = []
+    card = pipeline.build_summary_card("Chandrayaan-3", ARTICLES, budget_s=0.05, deadline_s=30,
+                                       on_draft=drafts.append)
+    assert len(drafts) == 1 and drafts[0]["draft"] and drafts[0]["timeline"]
+    assert not card.get("draft") and card["timeline"]
+
+
+def test_hedged_card_falls_back_to_the_draft_at_the_deadline(stand_in):
+    import pipeline
+
+    stand_in.set_model_factory(SlowModel)
+    notes = []
+    t0 = time.monotonic()
+    card = pipeline.build_summary_card("Chandrayaan-3", ARTICLES, notify=lambda level, msg: notes.append(level),
+                                       deadline_s=0.1)
+    assert time.monotonic() - t0 < 0.3
+    assert card["draft"] and card["summary"] != "Summary unavailable."
+    assert notes[-1] == "warning"
+
+
+def test_fast_llm_card_skips_the_draft(stand_in):
+    import pipeline
+
+    drafts = []
+    card = pipeline.build_summary_card("Chandrayaan-3", ARTICLES, budget_s=10, on_draft=drafts.append)
+    assert not drafts and not card.get("draft")
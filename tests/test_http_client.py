@@ -0,0 +1,30 @@
+from benchmarks.stand_in import SERVER_STATS
+from http_client import set_http_cache
+from tracing import start_trace
+
+
+def test_revalidation_serves_stored_parse_on_304(fixture_server):
+    from fetch_google_news import fetch_google_news
+
+    with start_trace("test") as trace:
+        first = fetch_google_news("Chandrayaan-3", max_results=15)
+        second = fetch_google_news("Chandrayaan-3", max_results=15)
+    assert first and first == second
+    assert SERVER_STATS["200"] == 1 and SERVER_STATS["304"] == 1
+    assert [s["cache_hit"] for s in trace.spans if s["name"] == "fetch.google_news"] == [False, True]
+
+
+def test_disabled_cache_always_downloads(fixture_server):
+    from fetch_gdelt import fetch_from_gdelt
+
+    set_http_cache("")
+    assert fetch_from_gdelt("Chandrayaan-3") == fetch_from_gdelt("Chandrayaan-3")
+    assert SERVER_STATS["304"] == 0 and SERVER_STATS["200"] == 2
+
+
+def test_fetched_articles_build_a_card_on_the_stand_in(fixture_server, stand_in):
+    import pipeline
+
+    articles = pipeline.clean_articles(pipeline.fetch_articles("Chandrayaan-3"))
+    card = pipeline.build_summary_card("Chandrayaan-3", articles)
+    assert card["timeline"] and card["sources"] and not card.get("degraded")
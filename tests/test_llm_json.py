@@ -0,0 +1,56 @@
+import time
+
+from llm_json import coerce_records, extract_json, records_of
+from llm_types import CredibilityResult, DiscrepancyResult
+
+CREDIBILITY = records_of(CredibilityResult.FIELDS, ("url",))
+
+
+def test_fenced_json_with_prose():
+    text = 'Sure! Here it is:\n```json\n{"timeline": [], "summary": "ok"}\n```\nLet me know…'
+    assert extract_json(text, expect=dict) == {"timeline": [], "summary": "ok"}
+
+
+def test_truncated_output_is_repaired():
+    assert extract_json('[{"url": "a", "credibility_score": 0.9}, {"url": "b", "cred', expect=list) == [
+        {"url": "a", "credibility_score": 0.9}, {"url": "b"}
+    ]
+
+
+def test_deep_nesting_does_not_raise():
+    assert extract_json("[" * 50000, expect=list) is None
+    assert extract_json("[" * 50000 + "]" * 50000, expect=list) is None
+
+
+def test_skips_values_that_fail_the_schema():
+    text = 'Here is [1] the result: [{"url": "u", "credibility_score": 0.9}]'
+    assert extract_json(text, expect=list, accept=CREDIBILITY) == [{"url": "u", "credibility_score": 0.9}]
+    assert extract_json('Use "[ ]" for none: [{"url": "u"}]', expect=list, accept=CREDIBILITY) == [{"url": "u"}]
+
+
+def test_stray_opener_in_prose():
+    assert extract_json('Note (see [1): {"a": 1}', expect=dict) == {"a": 1}
+    assert extract_json('Note (see [1): {"a": 1}') == {"a": 1}
+
+
+def test_many_bracketed_prose_spans_stay_linear():
+    text = "[x] " * 32000 + '{"a": 1}'
+    t0 = time.perf_counter()
+    assert extract_json(text, expect=dict) == {"a": 1}
+    assert time.perf_counter() - t0 < 1.0
+
+
+def test_coerce_records_skips_invalid_items():
+    fields = {"url": (str, ""), "credibility_score": (float, 0.6)}
+    items = [{"url": "a", "credibility_score": "0.8"}, {"credibility_score": 1}, "junk", {"url": "b"}]
+    assert coerce_records(items, fields, required=("url",)) == [
+        {"url": "a", "credibility_score": 0.8},
+        {"url": "b", "credibility_score": 0.6},
+    ]
+
+
+def test_mutable_defaults_are_not_shared():
+    first = DiscrepancyResult.from_dict({})
+    assert first.discrepancies == [] and first.discrepancies is not DiscrepancyResult.FIELDS["discrepancies"][1]
+    first.discrepancies.append("x")
+    assert DiscrepancyResult.from_dict({}).discrepancies == []
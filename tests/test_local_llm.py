@@ -0,0 +1,73 @@
+import json
+
+from benchmarks.stand_in import fixture_articles
+from llm_types import DiscrepancyResult, TimelineSummary
+from local_llm import StandInModel
+from story_index import StoryIndex
+
+EVENTS = [
+    {"date": "2023-08-17", "event": "Vikram lander separated from the propulsion module"},
+    {"date": "2023-08-23", "event": "Vikram landed near the lunar south pole"},
+    {"date": "2023-08-24", "event": "Pragyan rover rolled out of the lander"},
+]
+ARTICLES = [
+    {"url": f"https://example.com/{i}", "source": src, "publishedAt": "2023-08-24T00:00:00Z",
+     "title": src, "content": text}
+    for i, (src, text) in enumerate([
+        ("A", "The Vikram lander separated from the propulsion module. Vikram landed near the lunar south pole."),
+        ("B", "Vikram landed near the lunar south pole after a tense descent. The Pragyan rover rolled out of the lander."),
+        ("C", "The Pragyan rover rolled out of the lander and began driving. The lander separated earlier."),
+    ])
+]
+
+
+def test_stand_in_answers_schema_valid_json():
+    prompt = "ARTICLES:\n" + json.dumps([{"title": "Vikram lands", "publishedAt": "2023-08-23T12:45:00Z"}])
+    reply = StandInModel("m").generate_content(prompt, generation_config={"response_schema": TimelineSummary.SCHEMA})
+    card = TimelineSummary.from_dict(json.loads(reply.text))
+    assert [t.to_dict() for t in card.timeline] == [{"date": "2023-08-23", "event": "Vikram lands"}]
+    assert reply.usage_metadata.prompt_token_count > 0
+
+
+def test_stand_in_replays_fixed_responses():
+    model = StandInModel("m", responses=["first", "second"])
+    assert [model.generate_content("p").text for _ in range(2)] == ["first", "second"]
+
+
+def test_llm_stages_run_on_the_stand_in(stand_in):
+    articles = fixture_articles()
+    result = stand_in.batch_timeline_and_summary(articles, query="Chandrayaan-3")
+    assert result.timeline and result.summary
+
+    scores = stand_in.batch_evaluate_link_authenticity(articles)
+    assert {r.url for r in scores} == {a["url"] for a in articles}
+    assert all(r.reasoning != stand_in.NO_SCORE_REASON for r in scores)
+
+    checked = stand_in.batch_check_discrepancies(EVENTS, ARTICLES)
+    assert [d.event for d in checked] == [e["event"] for e in EVENTS]
+
+
+def test_dropped_middle_item_keeps_verdicts_on_their_events(stand_in, tmp_path):
+    reply = json.dumps([
+        {**EVENTS[0], "is_consistent": False, "discrepancies": ["x"], "severity": "high"},
+        {**EVENTS[2], "is_consistent": True, "severity": "low"},
+    ])
+    stand_in.set_model_factory(lambda name: StandInModel(name, responses=[reply]))
+    store = StoryIndex(str(tmp_path / "stories.sqlite3"))
+
+    checked = stand_in.batch_check_discrepancies(EVENTS, ARTICLES, store=store)
+    assert [d.severity for d in checked] == ["high", "medium", "low"]
+    assert checked[1].discrepancies == ["Parsing error"]
+
+    # the two real verdicts were stored under their own events; only the
+    # dropped event is asked again (the replay is used up, so the stand-in answers)
+    again = stand_in.batch_check_discrepancies(EVENTS, ARTICLES, store=store)
+    assert [d.severity for d in again] == ["high", "low", "low"]
+    assert again[0].discrepancies == ["x"] and again[1].discrepancies == []
+
+
+def test_match_to_events_uses_position_only_for_complete_replies(stand_in):
+    shard = [{"event": e["event"]} for e in EVENTS]
+    unnamed = [DiscrepancyResult(severity=s) for s in ("low", "medium", "high")]
+    assert [d.severity for d in stand_in._match_to_events(unnamed, shard)] == ["low", "medium", "high"]
+    assert stand_in._match_to_events(unnamed[:2], shard) == [None, None, None]
@@ -0,0 +1,83 @@
+import pytest
+
+import model_router
+from model_router import ModelRouter, ModelSpec, is_rate_limit_error
+from rate_limit import configure_rate_limits
+
+
+@pytest.fixture(autouse=True)
+def no_pacing():
+    configure_rate_limits(share=0)
+    yield
+    configure_rate_limits(share=1)
+
+
+def _router():
+    return ModelRouter([
+        ModelSpec("models/test-lite", tier=0, cost=0, rpm=30, latency_s=1.0),
+        ModelSpec("models/test-flash", tier=1, cost=1, rpm=15, latency_s=2.0),
+    ])
+
+
+@pytest.mark.parametrize("message, throttled", [
+    ("429 Resource has been exhausted (e.g. check quota).", True),
+    ("Quota exceeded for metric generate_content_requests", True),
+    ("Rate limit reached", True),
+    ("400 GenerateContentRequest.contents: contents is not specified", False),
+    ("Response blocked: moderate risk", False),
+])
+def test_is_rate_limit_error(message, throttled):
+    assert is_rate_limit_error(RuntimeError(message)) is throttled
+
+
+def test_throttled_model_fails_over_and_cools_down():
+    router = _router()
+
+    def call(name):
+        if name == "models/test-lite":
+            raise RuntimeError("429 quota exhausted")
+        return name
+
+    result, info = router.run("credibility", 100, call)
+    assert result == "models/test-flash" and info["failovers"] == 1
+    assert [m.name for m in router.route("credibility", 100)][0] == "models/test-flash"
+
+
+def test_bad_request_is_raised_without_cooldown():
+    router = _router()
+
+    def call(name):
+        raise ValueError("400 GenerateContentRequest.contents: bad")
+
+    with pytest.raises(ValueError):
+        router.run("credibility", 100, call)
+    assert all(s["cooldown_s"] == 0 for s in router.snapshot())
+
+
+def test_errored_model_is_probed_again_and_recovers():
+    router = _router()
+    lite = router.models[0]
+
+    def flaky(name):
+        raise RuntimeError("500 Internal error")
+
+    with pytest.raises(RuntimeError):
+        router.run("credibility", 100, flaky)
+    assert router.route("credibility", 100)[0].name == "models/test-flash"
+
+    # after PROBE_AFTER_S idle, one probe goes to the failing model; a success restores it
+    at, latency, outcome = router.stats[lite.name].calls[-1]
+    router.stats[lite.name].calls[-1] = (at - model_router.PROBE_AFTER_S - 1, latency, outcome)
+    result, info = router.run("credibility", 100, lambda name: name)
+    assert result == lite.name
+    assert all(router.route("credibility", 100)[0].name == lite.name for _ in range(5))
+
+
+def test_old_errors_expire_from_the_stats():
+    router = _router()
+    stats = router.stats["models/test-lite"]
+    stats.record(1.0, "error")
+    assert stats.rate("error") == 1.0
+    at, latency, outcome = stats.calls[-1]
+    stats.calls[-1] = (at - model_router.STATS_WINDOW_S - 1, latency, outcome)
+    assert stats.rate("error") == 0.0
@@ -0,0 +1,67 @@
+import os
+import threading
+import time
+from multiprocessing import AuthenticationError
+
+import pytest
+
+import ner_worker
+from ner_worker import NERClient, NERWorker, parse_address
+
+KEY = b"test-secret"
+
+
+def _fake_ner(texts, **kwargs):
+    return [[{"word": t.split()[0], "entity_group": "ORG", "start": 0, "end": len(t.split()[0])}]
+            for t in texts]
+
+
+@pytest.fixture
+def worker(tmp_path):
+    address = str(tmp_path / "ner.sock")
+    worker = NERWorker(_fake_ner, max_batch=8, max_wait_ms=50)
+    threading.Thread(target=worker.serve_forever, args=(address, KEY), daemon=True).start()
+    deadline = time.monotonic() + 5
+    while not os.path.exists(address) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    worker.address = address
+    return worker
+
+
+def test_parse_address():
+    assert parse_address("127.0.0.1:6010") == ("127.0.0.1", 6010)
+    assert parse_address(":6010") == ("127.0.0.1", 6010)
+    assert parse_address("/tmp/ner.sock") == "/tmp/ner.sock"
+
+
+def test_concurrent_clients_share_batches(worker):
+    client = NERClient(worker.address, authkey=KEY)
+    results = {}
+
+    def annotate(i):
+        results[i] = client.annotate([f"ISRO{i} launched", f"NASA{i} watched"])
+
+    threads = [threading.Thread(target=annotate, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for i in range(4):
+        assert results[i] == [[{"text": f"ISRO{i}", "label": "ORG", "start": 0, "end": len(f"ISRO{i}")}],
+                              [{"text": f"NASA{i}", "label": "ORG", "start": 0, "end": len(f"NASA{i}")}]]
+    assert worker.texts == 8 and worker.batches < 4
+
+
+def test_wrong_authkey_is_rejected(worker):
+    with pytest.raises(AuthenticationError):
+        NERClient(worker.address, authkey=b"wrong").annotate(["ISRO"])
+    assert NERClient(worker.address, authkey=KEY).annotate(["ISRO"])
+
+
+def test_worker_refuses_to_start_without_a_key(monkeypatch):
+    monkeypatch.delenv("NER_WORKER_AUTHKEY", raising=False)
+    with pytest.raises(ValueError):
+        NERClient("127.0.0.1:6010")
+    with pytest.raises(SystemExit):
+        ner_worker.main(["--address", "127.0.0.1:0"])
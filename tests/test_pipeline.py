@@ -0,0 +1,43 @@
+import pytest
+
+from benchmarks.stand_in import fixture_articles
+from local_llm import StandInModel
+
+
+def _model_failing(marker, reply=None, error=None):
+    """Stand-in that answers `reply` (or raises `error`) for prompts containing marker."""
+    class Model(StandInModel):
+        def generate_content(self, prompt, **kwargs):
+            if marker in prompt:
+                if error:
+                    raise error
+                return StandInModel(self.model_name, responses=[reply]).generate_content(prompt)
+            return super().generate_content(prompt, **kwargs)
+    return Model
+
+
+@pytest.fixture
+def articles():
+    import pipeline
+    return pipeline.clean_articles(fixture_articles())
+
+
+def test_complete_card_is_not_degraded(stand_in, articles):
+    import pipeline
+    assert not pipeline.build_summary_card("Chandrayaan-3", articles).get("degraded")
+
+
+def test_unparseable_credibility_reply_degrades_the_card(stand_in, articles):
+    import pipeline
+    stand_in.set_model_factory(_model_failing("credibility_score", reply="Sorry, I cannot help with that."))
+    card = pipeline.build_summary_card("Chandrayaan-3", articles)
+    assert card["degraded"]
+    assert {s["credibility_score"] for s in card["sources"]} == {0.6}
+
+
+def test_failed_discrepancy_check_degrades_the_card(stand_in, articles, monkeypatch):
+    import pipeline
+    monkeypatch.setattr(stand_in, "CLAIM_PREFILTER", False)
+    stand_in.set_model_factory(_model_failing("comes with EVIDENCE", error=RuntimeError("500 Internal error")))
+    card = pipeline.build_summary_card("Chandrayaan-3", articles)
+    assert card["degraded"] and card["timeline"]
@@ -0,0 +1,109 @@
+import pytest
+
+from story_index import StoryIndex, query_terms, verdict_key
+
+
+def _articles(prefix, n, title, entities):
+    return [
+        {"url": f"https://example.com/{prefix}/{i}", "title": title,
+         "content": f"{title}. The lander touched down near the lunar south pole.",
+         "entities": [{"text": e, "label": "ORG"} for e in entities]}
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def index(tmp_path):
+    idx = StoryIndex(str(tmp_path / "stories.sqlite3"))
+    story_id, _ = idx.assign("Chandrayaan-3", _articles("c3", 4, "Chandrayaan-3 lands on the Moon", ["ISRO"]))
+    idx.save_card(story_id, {"query": "Chandrayaan-3", "timeline": [], "summary": "s", "sources": []})
+    return idx
+
+
+def test_query_terms_keep_digits():
+    assert query_terms("Chandrayaan-3") == ["chandrayaan", "3"]
+    assert query_terms("Chandrayaan-3") != query_terms("Chandrayaan-2")
+
+
+def test_resolve_only_queries_naming_the_story(index):
+    assert index.resolve("Chandrayaan-3") == 1
+    assert index.resolve("chandrayaan 3") == 1
+    assert index.resolve("ISRO Chandrayaan-3") == 1
+    for other in ("Chandrayaan-2", "Chandrayaan-1", "India", "first country", "August 2023",
+                  "Chandrayaan-3 landing"):
+        assert index.resolve(other) is None, other
+        assert index.card_for_query(other) is None
+
+
+def test_card_for_query_relabels_and_expires(index):
+    assert index.card_for_query("ISRO Chandrayaan-3")["query"] == "ISRO Chandrayaan-3"
+    assert index.card_for_query("Chandrayaan-3", max_age=-1) is None
+
+
+def test_assign_clusters_related_batches(index):
+    related = _articles("landing", 3, "Chandrayaan-3 lander touches down on the Moon", ["ISRO"])
+    story_id, new_urls = index.assign("Chandrayaan-3 landing", related)
+    assert story_id == 1 and len(new_urls) == 3
+    assert index.assign("Chandrayaan-3 landing", related) == (1, [])
+
+
+def test_assign_keeps_numbered_siblings_apart(index):
+    sibling = _articles("c2", 3, "Chandrayaan-2 lands on the Moon", ["ISRO"])
+    story_id, _ = index.assign("Chandrayaan-2", sibling)
+    assert story_id != 1
+
+
+def test_reusable_analysis_needs_covered_urls(index):
+    index.save_card(1, {"timeline": [{"date": "2023-08-23", "event": "Landed"}], "summary": "s",
+                        "sources": [{"url": "https://example.com/c3/0"}]})
+    assert index.reusable_analysis(1, ["https://example.com/c3/0"]) == (
+        [{"date": "2023-08-23", "event": "Landed"}], "s")
+    assert index.reusable_analysis(1, ["https://example.com/c3/0", "https://example.com/new"]) is None
+
+
+def test_credibility_and_verdicts_round_trip(index):
+    index.save_credibility([{"url": "u1", "credibility_score": 0.9}])
+    assert index.load_credibility(["u1", "u2"]) == {"u1": {"url": "u1", "credibility_score": 0.9}}
+
+    event = {"date": "2023-08-23", "event": "Landed", "evidence": [{"text": "b"}, {"text": "a"}]}
+    same = {"date": "2023-08-23", "event": "Landed", "evidence": [{"text": "a"}, {"text": "b"}]}
+    assert verdict_key(event) == verdict_key(same)
+    index.save_verdicts({verdict_key(event): {"is_consistent": True}})
+    assert index.load_verdicts([verdict_key(same)]) == {verdict_key(same): {"is_consistent": True}}
+
+
+def _pipeline_with(monkeypatch, index):
+    import pipeline
+    monkeypatch.setattr(pipeline, "get_story_index", lambda: index)
+    return pipeline
+
+
+def test_complete_card_is_stored_and_served(stand_in, index, monkeypatch):
+    pipeline = _pipeline_with(monkeypatch, index)
+    articles = _articles("c3", 4, "Chandrayaan-3 lands on the Moon", ["ISRO"])
+    story_id = pipeline.index_articles("Chandrayaan-3", articles)
+    card = pipeline.build_summary_card("Chandrayaan-3", articles, story_id=story_id)
+    assert not card.get("degraded")
+    assert pipeline.lookup_story_card("Chandrayaan-3")["timeline"] == card["timeline"]
+
+
+def test_card_with_failed_discrepancy_check_is_not_stored(stand_in, tmp_path, monkeypatch):
+    from local_llm import StandInModel
+
+    class FailingChecks(StandInModel):
+        def generate_content(self, prompt, **kwargs):
+            if "comes with EVIDENCE" in prompt:
+                raise RuntimeError("500 Internal error")
+            return super().generate_content(prompt, **kwargs)
+
+    stand_in.set_model_factory(FailingChecks)
+    index = StoryIndex(str(tmp_path / "fresh.sqlite3"))
+    pipeline = _pipeline_with(monkeypatch, index)
+    articles = _articles("c3", 4, "Chandrayaan-3 lands on the Moon", ["ISRO"])
+    story_id = pipeline.index_articles("Chandrayaan-3", articles)
+    card = pipeline.build_summary_card("Chandrayaan-3", articles, story_id=story_id)
+
+    assert card["degraded"]
+    assert card["discrepancies"]
+    assert all(d["discrepancies"][0].startswith("Check failed") for d in card["discrepancies"])
+    assert pipeline.lookup_story_card("Chandrayaan-3") is None
@@ -0,0 +1,72 @@
+import contextvars
+import json
+import threading
+
+import pytest
+
+from tracing import current_trace, span, start_trace
+
+
+def test_span_outside_a_trace_is_a_no_op():
+    assert current_trace() is None
+    with span("fetch.gdelt", query="q") as s:
+        s["items"] = 3
+    assert s["items"] == 3 and s["wall_ms"] >= 0
+
+
+def test_nested_spans_and_stage_totals():
+    with start_trace("Chandrayaan-3") as trace:
+        with span("llm.timeline") as outer:
+            outer["prompt_tokens"] = 100
+            with span("fetch.gdelt", cache_hit=True) as inner:
+                inner["bytes"] = 10
+        with span("llm.timeline") as again:
+            again["prompt_tokens"] = 50
+    assert current_trace() is None
+
+    assert [(s["name"], s["depth"]) for s in trace.spans] == [
+        ("fetch.gdelt", 1), ("llm.timeline", 0), ("llm.timeline", 0)]
+    totals = trace.stage_totals()
+    assert totals["llm.timeline"]["calls"] == 2 and totals["llm.timeline"]["prompt_tokens"] == 150
+    assert "cache_hit" not in totals["fetch.gdelt"]
+    assert trace.wall_ms >= sum(s["wall_ms"] for s in trace.spans if s["depth"] == 0)
+
+
+def test_errors_are_recorded_and_reraised():
+    with start_trace("q") as trace:
+        with pytest.raises(ValueError):
+            with span("llm.credibility"):
+                raise ValueError("bad")
+    assert trace.spans[0]["error"] == "ValueError: bad"
+
+
+def test_spans_from_copied_contexts_join_the_trace():
+    with start_trace("q") as trace:
+        ctx = contextvars.copy_context()
+
+        def work():
+            with span("ner"):
+                pass
+
+        t = threading.Thread(target=ctx.run, args=(work,))
+        t.start()
+        t.join()
+    assert [s["name"] for s in trace.spans] == ["ner"]
+
+
+def test_trace_file_gets_one_line_per_span(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    with start_trace("q", trace_file=str(path)) as trace:
+        with span("a"):
+            pass
+        with span("b"):
+            pass
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["name"] for line in lines] == ["a", "b"]
+    assert {line["trace_id"] for line in lines} == {trace.trace_id}
+
+
+def test_profile_is_captured_on_request():
+    with start_trace("q", profile=True) as trace:
+        sum(range(1000))
+    assert "function calls" in trace.profile
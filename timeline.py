@@ -1,26 +1,25 @@
 # timeline.py
+import re
 from collections import defaultdict
-from dateutil import parser
+
+from chunking import iter_sentences
+from dates import normalize_day
+
+_TRIGGERS = re.compile(r"announce|launch|land|arrive|confirm|reach|declare|resign|investigate|file|deploy", re.I)
 
 def build_candidate_milestones(articles):
-    import re
-    triggers = ['announce','launch','land','arrive','confirm','reach','declare','resign','investigate','file','deploy']
     candidates = []
     for a in articles:
         content = a.get("content","") or ""
-        sents = [s.strip() for s in re.split(r'(?<=[.!?])\s+', content) if s.strip()]
-        for s in sents:
-            if any(k in s.lower() for k in triggers):
+        for s in iter_sentences(content):
+            if _TRIGGERS.search(s):
                 candidates.append({"sentence": s, "publishedAt": a.get("publishedAt"), "source": a.get("source"), "url": a.get("url")})
     return candidates
 
 def assemble_timeline(candidates):
     by_date = defaultdict(list)
     for c in candidates:
-        try:
-            d = parser.isoparse(c.get("publishedAt")).date().isoformat()
-        except Exception:
-            d = "unknown"
+        d = normalize_day(c.get("publishedAt")) or "unknown"
         by_date[d].append(c)
     timeline = []
     for d in sorted([k for k in by_date.keys() if k != "unknown"]):
@@ -0,0 +1,119 @@
+# tracing.py — lightweight per-request tracing spans (+ optional cProfile)
+#
+#   with start_trace("Chandrayaan-3") as trace:
+#       with span("fetch.gdelt", query=q) as s:
+#           ...
+#           s["bytes"] = len(resp.content)
+#
+# Spans record wall time plus any attributes the caller sets (bytes, items,
+# prompt_tokens, output_tokens, cache_hit, ...). Outside a trace, span() is a
+# cheap no-op recorder so instrumented code never has to check.
+import contextvars
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+TRACE_FILE = os.getenv("ORCHESTRATOR_TRACE_FILE")      # JSONL sink, one span per line
+PROFILE_ALL = os.getenv("ORCHESTRATOR_PROFILE") == "1"  # cProfile every request
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+_current_span = contextvars.ContextVar("current_span", default=None)
+_file_lock = threading.Lock()
+
+
+class Trace:
+    def __init__(self, name, **attrs):
+        self.trace_id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.attrs = attrs
+        self.spans = []
+        self.profile = None     # pstats text when profiling was enabled
+        self.wall_ms = None
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            self.spans.append(record)
+
+    def stage_totals(self):
+        """Aggregate spans by name → {"calls", "wall_ms", numeric attrs summed}."""
+        totals = {}
+        for s in self.spans:
+            t = totals.setdefault(s["name"], {"calls": 0, "wall_ms": 0.0})
+            t["calls"] += 1
+            t["wall_ms"] += s["wall_ms"]
+            for k, v in s.items():
+                if k in ("wall_ms", "start_ms", "depth") or isinstance(v, bool):
+                    continue
+                if isinstance(v, (int, float)):
+                    t[k] = t.get(k, 0) + v
+        return totals
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+@contextmanager
+def start_trace(name, profile=False, trace_file=None, **attrs):
+    """
+    Open a trace for one request. Spans recorded in this context (and in
+    threads started with contextvars.copy_context()) are attached to it.
+    """
+    trace = Trace(name, **attrs)
+    token = _current_trace.set(trace)
+    profiler = cProfile.Profile() if (profile or PROFILE_ALL) else None
+    if profiler:
+        profiler.enable()
+    try:
+        yield trace
+    finally:
+        if profiler:
+            profiler.disable()
+            buf = io.StringIO()
+            pstats.Stats(profiler, stream=buf).sort_stats("cumulative").print_stats(40)
+            trace.profile = buf.getvalue()
+        trace.wall_ms = (time.perf_counter() - trace._t0) * 1000
+        _current_trace.reset(token)
+        write_trace(trace, trace_file or TRACE_FILE)
+
+
+@contextmanager
+def span(name, **attrs):
+    """Time a block. Yields a dict the caller may add attributes to."""
+    trace = _current_trace.get()
+    parent = _current_span.get()
+    record = {"name": name, **attrs}
+    record["depth"] = parent["depth"] + 1 if parent else 0
+    token = _current_span.set(record)
+    t0 = time.perf_counter()
+    try:
+        yield record
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        record["wall_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+        _current_span.reset(token)
+        if trace is not None:
+            record["start_ms"] = round((t0 - trace._t0) * 1000, 3)
+            trace.add(record)
+
+
+def write_trace(trace, path):
+    if not path:
+        return
+    lines = [
+        json.dumps({"trace_id": trace.trace_id, "trace": trace.name, **s}, ensure_ascii=False, default=str)
+        for s in trace.spans
+    ]
+    with _file_lock, open(path, "a", encoding="utf-8") as f:
+        for line in lines:
+            f.write(line + "\n")